@@ -0,0 +1,90 @@
+"""Favorites access pattern indexes
+
+Revision ID: 1ce17964cd63
+Revises: 82f3739bb9df
+Create Date: 2026-10-18 11:03:27.904116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1ce17964cd63'
+down_revision: Union[str, None] = '82f3739bb9df'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_Favorites_consumer_id_created_at',
+            'Favorites',
+            ['consumer_id', 'created_at'],
+            unique=False,
+            postgresql_include=['product_id'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_Favorites_product_id',
+            'Favorites',
+            ['product_id'],
+            unique=False,
+            postgresql_include=['consumer_id'],
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_users_hashed_password',
+            table_name='users',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_users_id',
+            table_name='users',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_Consumers_id',
+            table_name='Consumers',
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_Consumers_id',
+            'Consumers',
+            ['id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_users_id',
+            'users',
+            ['id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_users_hashed_password',
+            'users',
+            ['hashed_password'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_Favorites_product_id',
+            table_name='Favorites',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_Favorites_consumer_id_created_at',
+            table_name='Favorites',
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,112 @@
+"""Product favorite counts
+
+Revision ID: 820faaabb6ce
+Revises: 1ce17964cd63
+Create Date: 2026-10-18 13:47:05.221874
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '820faaabb6ce'
+down_revision: Union[str, None] = '1ce17964cd63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('ProductFavoriteCounts',
+    sa.Column('product_id', sa.String(), nullable=False),
+    sa.Column('favorites_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('product_id')
+    )
+    op.create_index(
+        'ix_ProductFavoriteCounts_favorites_count',
+        'ProductFavoriteCounts',
+        [sa.text('favorites_count DESC'), 'product_id'],
+        unique=False,
+    )
+
+    # Triggers keep the counters right for every write path, including the
+    # ON DELETE CASCADE from Consumers. They are statement level: favorites
+    # are written many rows per statement in request order, and row-level
+    # upserts would lock the counters in that order, so two requests with
+    # overlapping ids in opposite orders could deadlock. Each statement
+    # instead applies one aggregated upsert per product, in product_id
+    # order. Transition tables allow a single event per trigger, hence one
+    # trigger per event.
+    op.execute("""
+        CREATE FUNCTION product_favorite_counts_sync() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO "ProductFavoriteCounts" (product_id, favorites_count)
+                SELECT product_id, count(*) FROM new_rows
+                GROUP BY product_id ORDER BY product_id
+                ON CONFLICT (product_id) DO UPDATE
+                SET favorites_count = "ProductFavoriteCounts".favorites_count
+                    + EXCLUDED.favorites_count;
+            ELSIF TG_OP = 'DELETE' THEN
+                INSERT INTO "ProductFavoriteCounts" (product_id, favorites_count)
+                SELECT product_id, -count(*) FROM old_rows
+                GROUP BY product_id ORDER BY product_id
+                ON CONFLICT (product_id) DO UPDATE
+                SET favorites_count = "ProductFavoriteCounts".favorites_count
+                    + EXCLUDED.favorites_count;
+            ELSE
+                INSERT INTO "ProductFavoriteCounts" (product_id, favorites_count)
+                SELECT product_id, sum(delta) FROM (
+                    SELECT product_id, 1 AS delta FROM new_rows
+                    UNION ALL
+                    SELECT product_id, -1 FROM old_rows
+                ) changes
+                GROUP BY product_id HAVING sum(delta) <> 0
+                ORDER BY product_id
+                ON CONFLICT (product_id) DO UPDATE
+                SET favorites_count = "ProductFavoriteCounts".favorites_count
+                    + EXCLUDED.favorites_count;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER favorites_product_counts_insert
+        AFTER INSERT ON "Favorites"
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION product_favorite_counts_sync()
+    """)
+    op.execute("""
+        CREATE TRIGGER favorites_product_counts_delete
+        AFTER DELETE ON "Favorites"
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION product_favorite_counts_sync()
+    """)
+    op.execute("""
+        CREATE TRIGGER favorites_product_counts_update
+        AFTER UPDATE ON "Favorites"
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION product_favorite_counts_sync()
+    """)
+    op.execute("""
+        INSERT INTO "ProductFavoriteCounts" (product_id, favorites_count)
+        SELECT product_id, count(*) FROM "Favorites" GROUP BY product_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for event in ("insert", "delete", "update"):
+        op.execute(
+            f'DROP TRIGGER favorites_product_counts_{event} ON "Favorites"'
+        )
+    op.execute('DROP FUNCTION product_favorite_counts_sync()')
+    op.drop_index(
+        'ix_ProductFavoriteCounts_favorites_count',
+        table_name='ProductFavoriteCounts',
+    )
+    op.drop_table('ProductFavoriteCounts')
@@ -0,0 +1,240 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+
+import httpx
+from fastapi import FastAPI, HTTPException
+from httpx._transports.asgi import ASGITransport
+from sqlalchemy import text
+
+from benchmarks.explain_indexes import SEED_CONSUMERS, SEED_FAVORITES
+from src.config.settings import settings
+from src.domains.products.sync import run_sync
+from src.index import app
+from src.infrastructure.database import engine
+from src.infrastructure.security import create_access_token
+from src.infrastructure.services.productsService import ProductsService
+
+# Drives the real app in-process, against the database from .env and a fake
+# products API with controlled latency and failures:
+#
+#   python -m benchmarks.endpoints --seed 10000 --output before.json
+#   python -m benchmarks.endpoints --output after.json --compare before.json
+
+FAKE_PRODUCTS_URL = "http://fake-products"
+
+ENDPOINTS = {
+    "products_page": "/api/v1/products?page=1&page_size=20",
+    "products_popular": "/api/v1/products/popular?page=1&page_size=20",
+    "consumers_page": "/api/v1/consumers/?page=1&page_size=100",
+    "consumers_page_no_total": (
+        "/api/v1/consumers/?page=1&page_size=100&include_total=false"
+    ),
+    "consumer_detail": "/api/v1/consumers/{consumer_id}",
+}
+
+
+def fake_product(product_id: int) -> dict:
+    return {
+        "id": product_id,
+        "title": f"Product {product_id}",
+        "price": round(10 + product_id * 1.5, 2),
+        "description": "Benchmark product",
+        "category": "benchmark",
+        "image": f"https://example.com/{product_id}.png",
+        "rating": {"rate": 4.5, "count": product_id * 10},
+    }
+
+
+def fake_products_api(
+    products: int,
+    latency: float,
+    jitter: float,
+    failure_rate: float,
+) -> FastAPI:
+    api = FastAPI()
+
+    async def respond():
+        await asyncio.sleep(latency + random.uniform(0, jitter))
+        if random.random() < failure_rate:
+            raise HTTPException(status_code=503, detail="Injected failure")
+
+    @api.get("/products")
+    async def list_products():
+        await respond()
+        return [fake_product(i) for i in range(1, products + 1)]
+
+    @api.get("/products/{product_id}")
+    async def get_product(product_id: int):
+        await respond()
+        if not 1 <= product_id <= products:
+            raise HTTPException(status_code=404)
+        return fake_product(product_id)
+
+    return api
+
+
+def percentile(ordered: list[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def measure(
+    client: httpx.AsyncClient,
+    path: str,
+    requests: int,
+    concurrency: int,
+) -> dict:
+    latencies = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "throughput_rps": requests / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+async def seed(args):
+    async with engine.begin() as conn:
+        if args.seed:
+            await conn.execute(text(SEED_CONSUMERS), {"consumers": args.seed})
+            await conn.execute(text(SEED_FAVORITES), {
+                "products": args.products,
+                "per_consumer": args.favorites_per_consumer,
+            })
+        await conn.execute(text('ANALYZE "Consumers"'))
+        await conn.execute(text('ANALYZE "Favorites"'))
+        consumer_id = (await conn.execute(text(
+            'SELECT id FROM "Consumers" ORDER BY id LIMIT 1'
+        ))).scalar_one_or_none()
+    return consumer_id
+
+
+async def run(args) -> dict:
+    settings.PRODUCTS_API_URL = FAKE_PRODUCTS_URL
+    ProductsService.client = httpx.AsyncClient(transport=ASGITransport(
+        app=fake_products_api(
+            args.products,
+            args.upstream_latency,
+            args.upstream_jitter,
+            args.upstream_failure_rate,
+        )
+    ))
+    try:
+        consumer_id = await seed(args)
+        if args.sync:
+            await run_sync()
+
+        headers = {
+            "Authorization": f"Bearer {create_access_token(str(uuid.uuid4()))}"
+        }
+        results = {}
+        async with httpx.AsyncClient(
+            transport=ASGITransport(app=app),
+            base_url="http://testserver",
+            headers=headers,
+        ) as client:
+            for name, path in ENDPOINTS.items():
+                if args.only and name not in args.only:
+                    continue
+                if "{consumer_id}" in path:
+                    if consumer_id is None:
+                        continue
+                    path = path.format(consumer_id=consumer_id)
+                await measure(client, path, args.warmup, args.concurrency)
+                results[name] = await measure(
+                    client, path, args.requests, args.concurrency
+                )
+        return results
+    finally:
+        await ProductsService.shutdown()
+        await engine.dispose()
+
+
+def describe(result: dict) -> str:
+    return (
+        f"{result['throughput_rps']:8.1f} req/s  "
+        f"p50 {result['p50_ms']:7.2f} ms  "
+        f"p95 {result['p95_ms']:7.2f} ms  "
+        f"p99 {result['p99_ms']:7.2f} ms  "
+        f"errors {result['errors']}"
+    )
+
+
+def change(before: float, after: float) -> str:
+    if not before:
+        return "n/a"
+    return f"{(after - before) / before * 100:+.1f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure endpoint throughput and latency percentiles."
+    )
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Insert this many synthetic consumers first.")
+    parser.add_argument("--products", type=int, default=20)
+    parser.add_argument("--favorites-per-consumer", type=int, default=5)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--upstream-latency", type=float, default=0.05,
+                        help="Seconds added to every fake upstream call.")
+    parser.add_argument("--upstream-jitter", type=float, default=0.02)
+    parser.add_argument("--upstream-failure-rate", type=float, default=0.0)
+    parser.add_argument("--no-sync", dest="sync", action="store_false",
+                        help="Skip syncing the local products table.")
+    parser.add_argument("--only", nargs="+", choices=sorted(ENDPOINTS))
+    parser.add_argument("--output", help="Save the results as JSON.")
+    parser.add_argument("--compare", help="Previous --output to diff with.")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    before = {}
+    if args.compare:
+        with open(args.compare) as f:
+            before = json.load(f)
+
+    for name, result in results.items():
+        print(name)
+        if name in before:
+            print("  before:", describe(before[name]))
+            print("  after: ", describe(result))
+            print("  change:", ", ".join(
+                f"{key} {change(before[name][key], result[key])}"
+                for key in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+            ))
+        else:
+            print("  ", describe(result))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import argparse
+import asyncio
+import json
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.config.settings import settings
+
+# Run once before and once after `alembic upgrade 1ce17964cd63`:
+#
+#   python -m benchmarks.explain_indexes --seed 100000 --output before.json
+#   alembic upgrade head
+#   python -m benchmarks.explain_indexes --output after.json --compare before.json
+
+QUERIES = {
+    "favorites_of_consumer_by_created_at": (
+        'SELECT product_id, created_at FROM "Favorites" '
+        "WHERE consumer_id = :consumer_id "
+        "ORDER BY created_at DESC LIMIT 50"
+    ),
+    "consumers_who_favorited_product": (
+        'SELECT consumer_id FROM "Favorites" WHERE product_id = :product_id'
+    ),
+    "count_favorites_of_product": (
+        'SELECT count(*) FROM "Favorites" WHERE product_id = :product_id'
+    ),
+}
+
+SEED_CONSUMERS = """
+INSERT INTO "Consumers" (id, name, email)
+SELECT gen_random_uuid(), 'bench ' || g, 'bench-' || g || '@example.com'
+FROM generate_series(1, :consumers) AS g
+ON CONFLICT DO NOTHING
+"""
+
+SEED_FAVORITES = """
+INSERT INTO "Favorites" (id, consumer_id, product_id, created_at)
+SELECT gen_random_uuid(), c.id, p.product_id,
+       now() - random() * interval '365 days'
+FROM "Consumers" AS c
+-- Referencing c.id keeps the subquery (and random()) per consumer.
+CROSS JOIN LATERAL (
+    SELECT (1 + floor(random() * :products))::int::text AS product_id
+    FROM generate_series(1, :per_consumer)
+    WHERE c.id IS NOT NULL
+) AS p
+WHERE c.email LIKE 'bench-%'
+ON CONFLICT DO NOTHING
+"""
+
+
+def summarize(plan: dict) -> dict:
+    nodes = []
+
+    def walk(node):
+        nodes.append({
+            "node": node["Node Type"],
+            "index": node.get("Index Name"),
+            "relation": node.get("Relation Name"),
+        })
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(plan["Plan"])
+    return {
+        "execution_ms": plan["Execution Time"],
+        "planning_ms": plan["Planning Time"],
+        "shared_hit_blocks": plan["Plan"].get("Shared Hit Blocks"),
+        "shared_read_blocks": plan["Plan"].get("Shared Read Blocks"),
+        "nodes": nodes,
+    }
+
+
+def describe(summary: dict) -> str:
+    nodes = ", ".join(
+        node["node"] + (f" [{node['index']}]" if node["index"] else "")
+        for node in summary["nodes"]
+    )
+    return f"{summary['execution_ms']:.3f} ms  {nodes}"
+
+
+async def run(args) -> dict:
+    engine = create_async_engine(settings.DATABASE_URL)
+    try:
+        async with engine.begin() as conn:
+            if args.seed:
+                await conn.execute(
+                    text(SEED_CONSUMERS), {"consumers": args.seed}
+                )
+                await conn.execute(text(SEED_FAVORITES), {
+                    "products": args.products,
+                    "per_consumer": args.favorites_per_consumer,
+                })
+            await conn.execute(text('ANALYZE "Favorites"'))
+
+        async with engine.connect() as conn:
+            consumer_id = (await conn.execute(text(
+                'SELECT consumer_id FROM "Favorites" '
+                "GROUP BY consumer_id ORDER BY count(*) DESC LIMIT 1"
+            ))).scalar_one_or_none()
+            params = {"consumer_id": consumer_id, "product_id": "1"}
+
+            results = {}
+            for name, query in QUERIES.items():
+                explained = await conn.execute(
+                    text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}"),
+                    params,
+                )
+                plan = explained.scalar_one()
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                results[name] = summarize(plan[0])
+        return results
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="EXPLAIN ANALYZE the Favorites access patterns."
+    )
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Insert this many synthetic consumers first.")
+    parser.add_argument("--products", type=int, default=20)
+    parser.add_argument("--favorites-per-consumer", type=int, default=5)
+    parser.add_argument("--output", help="Save the plan summaries as JSON.")
+    parser.add_argument("--compare", help="Previous --output to diff with.")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    before = {}
+    if args.compare:
+        with open(args.compare) as f:
+            before = json.load(f)
+
+    for name, summary in results.items():
+        print(name)
+        if name in before:
+            print("  before:", describe(before[name]))
+            print("  after: ", describe(summary))
+        else:
+            print("  ", describe(summary))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
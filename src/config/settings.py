@@ -1,3 +1,5 @@
+from typing import Literal
+
 from dotenv import load_dotenv
 from pydantic import ConfigDict
 from pydantic_settings import BaseSettings
@@ -14,6 +16,43 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    TOKEN_CACHE_MAX_SIZE: int = 10000
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 256
+    PRODUCTS_API_URL: str = "https://fakestoreapi.com"
+    PRODUCTS_HTTP2: bool = True
+    PRODUCTS_MAX_CONNECTIONS: int = 100
+    PRODUCTS_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    PRODUCTS_KEEPALIVE_EXPIRY: float = 30.0
+    PRODUCTS_CONNECT_TIMEOUT: float = 2.0
+    PRODUCTS_READ_TIMEOUT: float = 5.0
+    PRODUCTS_MAX_RETRIES: int = 2
+    PRODUCTS_RETRY_BACKOFF_SECONDS: float = 0.1
+    PRODUCTS_RETRY_MAX_BACKOFF_SECONDS: float = 1.0
+    PRODUCTS_RETRY_BUDGET_RATIO: float = 0.2
+    PRODUCTS_RETRY_BUDGET_MAX_TOKENS: float = 10.0
+    PRODUCTS_BREAKER_FAILURE_THRESHOLD: int = 5
+    PRODUCTS_BREAKER_RESET_SECONDS: float = 30.0
+    PRODUCTS_HEDGE_ENABLED: bool = False
+    PRODUCTS_HEDGE_DELAY_SECONDS: float = 0.0
+    PRODUCTS_HEDGE_MIN_SAMPLES: int = 50
+    PRODUCTS_HEDGE_MAX_RATIO: float = 0.1
+    PRODUCTS_HEDGE_BUDGET_MAX_TOKENS: float = 5.0
+    PRODUCTS_CACHE_TTL_SECONDS: float = 300.0
+    PRODUCTS_CACHE_STALE_SECONDS: float = 3600.0
+    PRODUCTS_CACHE_MAX_SIZE: int = 1024
+    CONSUMER_COUNT_STRATEGY: Literal["exact", "estimate", "cached"] = "exact"
+    CONSUMER_COUNT_CACHE_SECONDS: float = 30.0
+    PRODUCTS_FETCH_CONCURRENCY: int = 10
+    CONSUMER_IMPORT_MAX_REJECTIONS: int = 1000
+    CONSUMER_CACHE_BACKEND: Literal["memory", "redis", "none"] = "memory"
+    CONSUMER_CACHE_TTL_SECONDS: float = 300.0
+    CONSUMER_CACHE_MAX_SIZE: int = 10000
+    REDIS_URL: str | None = None
+    METRICS_ENABLED: bool = True
+    SQL_DEBUG_HEADER: bool = False
+    PRODUCTS_SYNC_ENABLED: bool = True
+    PRODUCTS_SYNC_INTERVAL_SECONDS: float = 3600.0
 
     @property
     def DATABASE_URL(self) -> str:
@@ -0,0 +1,118 @@
+from typing import Optional
+
+from src.config.settings import settings
+from src.infrastructure.cache import build_backend
+
+
+class ConsumerCache:
+    # Rendered ConsumerResponse bodies, dropped by the repository writes
+    # that touch the consumer. Product details can still change through
+    # the catalog sync, which the TTL bounds.
+    #
+    # Each consumer also has a generation that invalidate() bumps. A reader
+    # takes it before loading from the database and only stores its payload
+    # if it is unchanged, so a load that raced with a write is not cached.
+    def __init__(self, backend, ttl: Optional[float] = None):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.stale_writes = 0
+        self.errors = 0
+
+    @staticmethod
+    def key(consumer_id) -> str:
+        return f"consumer:{consumer_id}"
+
+    @staticmethod
+    def generation_key(consumer_id) -> str:
+        return f"consumer-generation:{consumer_id}"
+
+    async def generation(self, consumer_id) -> Optional[int]:
+        if self.backend is None:
+            return None
+        try:
+            return await self.backend.generation(
+                self.generation_key(consumer_id)
+            )
+        except Exception:
+            self.errors += 1
+            return None
+
+    async def get(self, consumer_id) -> Optional[bytes]:
+        if self.backend is None:
+            return None
+        try:
+            payload = await self.backend.get(self.key(consumer_id))
+        except Exception:
+            # A shared backend being down degrades to a cache miss.
+            self.errors += 1
+            payload = None
+        if payload is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return payload
+
+    async def set(self, consumer_id, payload: bytes, generation: int):
+        if self.backend is None or generation is None:
+            return
+        try:
+            stored = await self.backend.set_if_generation(
+                self.key(consumer_id),
+                payload,
+                self.ttl,
+                self.generation_key(consumer_id),
+                generation,
+            )
+        except Exception:
+            self.errors += 1
+            return
+        if not stored:
+            self.stale_writes += 1
+
+    async def invalidate(self, consumer_id):
+        if self.backend is None:
+            return
+        self.invalidations += 1
+        try:
+            # Bump first: a reader that loaded before this write can no
+            # longer store its payload, even after the delete below.
+            await self.backend.bump(
+                self.generation_key(consumer_id),
+                ttl=self.ttl * 2 if self.ttl else None,
+            )
+            await self.backend.delete(self.key(consumer_id))
+        except Exception:
+            self.errors += 1
+
+    async def clear(self):
+        if self.backend is not None:
+            await self.backend.clear()
+
+    async def close(self):
+        if self.backend is not None:
+            await self.backend.close()
+
+    def stats(self) -> dict:
+        return {
+            "backend": getattr(self.backend, "name", "none"),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "stale_writes": self.stale_writes,
+            "errors": self.errors,
+            "store": self.backend.stats() if self.backend is not None else {},
+        }
+
+
+consumer_cache = ConsumerCache(
+    build_backend(
+        settings.CONSUMER_CACHE_BACKEND,
+        max_size=settings.CONSUMER_CACHE_MAX_SIZE,
+        redis_url=settings.REDIS_URL,
+        prefix="favorites-api:",
+    ),
+    ttl=settings.CONSUMER_CACHE_TTL_SECONDS,
+)
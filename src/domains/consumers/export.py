@@ -0,0 +1,94 @@
+import csv
+import io
+from typing import AsyncIterator, Callable
+
+import orjson
+
+from src.domains.consumers.repositories import (
+    ConsumerRepository,
+    FavoriteRepository,
+)
+from src.domains.products.schemas import ProductDetails
+from src.domains.products.services import ProductService
+from src.infrastructure.database import AsyncSessionLocal
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+CSV_COLUMNS = [
+    "id",
+    "name",
+    "email",
+    "favorite_product_ids",
+    "favorite_product_titles",
+]
+
+
+def encode_ndjson(records: list[dict]) -> bytes:
+    return b"".join(orjson.dumps(record) + b"\n" for record in records)
+
+
+def encode_csv(records: list[dict], header: bool = False) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(CSV_COLUMNS)
+    for record in records:
+        writer.writerow([
+            record["id"],
+            record["name"],
+            record["email"],
+            "|".join(str(p["id"]) for p in record["favorites"]),
+            "|".join(p["title"] for p in record["favorites"]),
+        ])
+    return buffer.getvalue().encode()
+
+
+async def export_consumers(
+    fmt: str,
+    chunk_size: int,
+    session_factory: Callable = AsyncSessionLocal,
+) -> AsyncIterator[bytes]:
+    # The request-scoped session is closed before a streaming body is sent,
+    # so the export opens its own: one holds the server-side cursor, the
+    # other runs the per-chunk favorites and product lookups.
+    async with session_factory() as stream_db, session_factory() as db:
+        first = True
+        async for rows in ConsumerRepository.stream_consumers(
+            stream_db, chunk_size
+        ):
+            favorites = await FavoriteRepository.get_product_ids_by_consumer_ids(
+                (row.id for row in rows),
+                db,
+            )
+            products_map = await ProductService.get_products_map(
+                {pid for ids in favorites.values() for pid in ids},
+                db,
+            )
+            details = {
+                product_id: ProductDetails(**product).model_dump(mode="json")
+                for product_id, product in products_map.items()
+            }
+            records = [
+                {
+                    "id": str(row.id),
+                    "name": row.name,
+                    "email": row.email,
+                    "favorites": [
+                        details[product_id]
+                        for product_id in favorites.get(row.id, [])
+                        if product_id in details
+                    ],
+                }
+                for row in rows
+            ]
+            if fmt == "csv":
+                yield encode_csv(records, header=first)
+            else:
+                yield encode_ndjson(records)
+            first = False
+
+        if fmt == "csv" and first:
+            yield encode_csv([], header=True)
@@ -0,0 +1,164 @@
+import argparse
+import asyncio
+import csv
+import itertools
+import json
+import pathlib
+from typing import AsyncIterator, Callable, Iterable
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config.settings import settings
+from src.domains.consumers.repositories import ConsumerRepository
+from src.domains.consumers.schemas import ConsumerCreate
+from src.infrastructure.database import AsyncSessionLocal
+
+# Rows read and parsed per worker thread hop.
+BATCH_SIZE = 1000
+
+
+def parse_ndjson(lines: Iterable[str]):
+    for line_no, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield line_no, None, "Invalid JSON"
+            continue
+        if not isinstance(row, dict):
+            yield line_no, None, "Expected a JSON object"
+            continue
+        favorites = row.get("favorite_product_ids", row.get("favorites", []))
+        if not isinstance(favorites, list):
+            yield line_no, row, "favorite_product_ids must be a list"
+            continue
+        # Accepts the export format too, where favorites are product objects.
+        row["favorite_product_ids"] = [
+            str(p["id"] if isinstance(p, dict) else p) for p in favorites
+        ]
+        yield line_no, row, None
+
+
+def parse_csv(lines: Iterable[str]):
+    reader = csv.DictReader(lines)
+    for row in reader:
+        row["favorite_product_ids"] = [
+            p for p in (row.get("favorite_product_ids") or "").split("|") if p
+        ]
+        yield reader.line_num, row, None
+
+
+PARSERS = {
+    "ndjson": parse_ndjson,
+    "csv": parse_csv,
+}
+
+
+def to_record(line_no: int, row: dict) -> tuple:
+    consumer = ConsumerCreate.model_validate(
+        {"name": row.get("name"), "email": row.get("email")}
+    )
+    return (
+        line_no,
+        consumer.name,
+        consumer.email,
+        list(dict.fromkeys(row["favorite_product_ids"])),
+    )
+
+
+async def iter_records(
+    fmt: str,
+    lines: Iterable[str],
+    reject: Callable[[int, str | None, str], None],
+) -> AsyncIterator[tuple]:
+    # Uploads are spooled to disk past a size, so reading and parsing run
+    # in a worker thread and never block the event loop.
+    rows = PARSERS[fmt](lines)
+    while batch := await asyncio.to_thread(
+        list, itertools.islice(rows, BATCH_SIZE)
+    ):
+        for line_no, row, error in batch:
+            email = row.get("email") if row else None
+            if error:
+                reject(line_no, email, error)
+                continue
+            try:
+                yield to_record(line_no, row)
+            except ValidationError as e:
+                first = e.errors()[0]
+                field = ".".join(str(part) for part in first["loc"])
+                reject(line_no, email, f"{field}: {first['msg']}")
+
+
+async def import_consumers(
+    fmt: str,
+    lines: Iterable[str],
+    db: AsyncSession,
+) -> dict:
+    max_rejections = settings.CONSUMER_IMPORT_MAX_REJECTIONS
+    rejections = []
+    invalid = 0
+
+    def reject(line_no, email, reason):
+        nonlocal invalid
+        invalid += 1
+        if len(rejections) < max_rejections:
+            rejections.append(
+                {"line": line_no, "email": email, "reason": reason}
+            )
+
+    await ConsumerRepository.create_import_staging(db)
+    copied = await ConsumerRepository.copy_import_rows(
+        iter_records(fmt, lines, reject),
+        db,
+    )
+
+    # Favorites are kept only for products in the local catalog.
+    merged = await ConsumerRepository.merge_import(db)
+    unknown = await ConsumerRepository.get_unknown_import_product_ids(
+        db, max_rejections
+    )
+
+    remaining = max_rejections - len(rejections)
+    if remaining > 0 and merged["imported"] < copied:
+        rejections.extend(
+            await ConsumerRepository.get_import_rejections(db, remaining)
+        )
+    await db.commit()
+
+    return {
+        "received": copied + invalid,
+        "imported": merged["imported"],
+        "favorites": merged["favorites"],
+        "rejected": invalid + copied - merged["imported"],
+        "rejections": sorted(rejections, key=lambda r: r["line"]),
+        "unknown_product_ids": unknown,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Bulk import consumers and favorites from NDJSON or CSV."
+    )
+    parser.add_argument("path", type=pathlib.Path)
+    parser.add_argument(
+        "--format",
+        choices=sorted(PARSERS),
+        help="Defaults to the file extension (.csv or NDJSON otherwise).",
+    )
+    args = parser.parse_args()
+    fmt = args.format or ("csv" if args.path.suffix == ".csv" else "ndjson")
+
+    async def run():
+        with args.path.open(encoding="utf-8", newline="") as lines:
+            async with AsyncSessionLocal() as db:
+                report = await import_consumers(fmt, lines, db)
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,13 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, ForeignKey, DateTime, UniqueConstraint
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    String,
+    UniqueConstraint,
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from src.infrastructure.database import Base
@@ -12,7 +19,6 @@ class Consumer(Base):
     id = Column(
         UUID(),
         primary_key=True,
-        index=True,
         default=uuid.uuid4
     )
     name = Column(
@@ -53,4 +59,15 @@ class Favorite(Base):
 
     __table_args__ = (
         UniqueConstraint('consumer_id', 'product_id', name='_consumer_product_uc'),
+        Index(
+            'ix_Favorites_consumer_id_created_at',
+            'consumer_id',
+            'created_at',
+            postgresql_include=['product_id'],
+        ),
+        Index(
+            'ix_Favorites_product_id',
+            'product_id',
+            postgresql_include=['consumer_id'],
+        ),
     )
@@ -1,151 +1,451 @@
 import datetime
+import uuid
+from collections import defaultdict
+from itertools import groupby
+from typing import AsyncIterator, Iterable, NamedTuple
 from uuid import UUID
-from sqlalchemy import select, func
+from sqlalchemy import (
+    DateTime,
+    Interval,
+    String,
+    bindparam,
+    delete,
+    exists,
+    func,
+    literal,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from src.domains.consumers.cache import consumer_cache
 from src.domains.consumers.models import Consumer, Favorite
 
+IMPORT_STAGING_TABLE = "consumer_import"
+
+
+class ConsumerRecord(NamedTuple):
+    # Read-only view of a consumer: no identity map, no change tracking.
+    id: UUID
+    name: str | None
+    email: str | None
+    product_ids: list[str]
+
+
+def group_records(rows) -> list[ConsumerRecord]:
+    # Rows come from a consumer LEFT JOIN favorites ordered by consumer.
+    return [
+        ConsumerRecord(
+            id=consumer_id,
+            name=name,
+            email=email,
+            product_ids=[
+                row.product_id for row in group if row.product_id is not None
+            ],
+        )
+        for (consumer_id, name, email), group in groupby(
+            rows, key=lambda row: (row.id, row.name, row.email)
+        )
+    ]
+
+
+def with_favorites(consumers):
+    # `consumers` is a subquery or CTE with id, name and email columns.
+    return (
+        select(
+            consumers.c.id,
+            consumers.c.name,
+            consumers.c.email,
+            Favorite.product_id,
+        )
+        .outerjoin(Favorite, Favorite.consumer_id == consumers.c.id)
+        .order_by(consumers.c.id, Favorite.created_at)
+    )
+
+
+def insert_favorites(consumer_id: UUID, product_ids: list[str]):
+    # The ids travel as one array parameter, so the statement stays under
+    # asyncpg's 32767 bind parameter limit whatever the list size. Each row
+    # is a microsecond after the previous one, so with_favorites keeps the
+    # order of the request.
+    ids = (
+        func.unnest(
+            bindparam("product_ids", list(product_ids), type_=ARRAY(String))
+        )
+        .table_valued("product_id", with_ordinality="ordinality")
+        .render_derived(name="ids")
+    )
+    step = literal(datetime.timedelta(microseconds=1), Interval())
+    return (
+        insert(Favorite)
+        .from_select(
+            ["id", "consumer_id", "product_id", "created_at"],
+            select(
+                func.gen_random_uuid(),
+                literal(consumer_id, Favorite.consumer_id.type),
+                ids.c.product_id,
+                literal(datetime.datetime.utcnow(), DateTime())
+                + ids.c.ordinality * step,
+            ),
+        )
+        .on_conflict_do_nothing(constraint="_consumer_product_uc")
+        .returning(Favorite.product_id)
+    )
+
 
 class ConsumerRepository:
     @staticmethod
-    async def create_consumer(consumer_data, db: AsyncSession):
-        existing_consumer = (
-            await ConsumerRepository.get_consumer_by_email(
-                consumer_data.email,
-                db,
+    async def create_consumer(
+        consumer_data, db: AsyncSession
+    ) -> ConsumerRecord:
+        # The unique index on email is the check: no SELECT beforehand, and
+        # no window for a concurrent insert to slip through.
+        try:
+            result = await db.execute(
+                insert(Consumer)
+                .values(
+                    id=uuid.uuid4(),
+                    name=consumer_data.name,
+                    email=consumer_data.email,
+                )
+                .returning(Consumer.id, Consumer.name, Consumer.email)
             )
-        )
-        if existing_consumer:
+            row = result.one()
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
             raise ValueError("Consumer with this email already exists")
-
-        new_consumer = Consumer(
-            name=consumer_data.name,
-            email=consumer_data.email,
-            favorites=[],
-        )
-        db.add(new_consumer)
-        await db.commit()
-        await db.refresh(new_consumer)
-        return new_consumer
+        return ConsumerRecord(*row, product_ids=[])
 
     @staticmethod
-    async def get_consumer_by_email(email: str, db: AsyncSession):
+    async def consumer_exists(consumer_id, db: AsyncSession) -> bool:
         result = await db.execute(
-            select(Consumer).filter(Consumer.email == email)
+            select(exists().where(Consumer.id == consumer_id))
         )
-        return result.scalar_one_or_none()
+        return result.scalar_one()
 
     @staticmethod
-    async def get_consumer_by_id(consumer_id: str, db: AsyncSession):
-        result = await db.execute(
-            select(Consumer)
-            .options(selectinload(Consumer.favorites))
-            .filter(Consumer.id == consumer_id)
-        )
-        return result.scalar_one_or_none()
+    async def get_consumer_record(
+        consumer_id: UUID, db: AsyncSession
+    ) -> ConsumerRecord | None:
+        result = await db.execute(with_favorites(
+            select(Consumer.id, Consumer.name, Consumer.email)
+            .where(Consumer.id == consumer_id)
+            .subquery()
+        ))
+        records = group_records(result.all())
+        return records[0] if records else None
 
     @staticmethod
     async def update_consumer(
-        consumer_id: str,
+        consumer_id: UUID,
         update_data: dict,
         db: AsyncSession,
-    ):
-        consumer = await ConsumerRepository.get_consumer_by_id(
-            consumer_id,
-            db,
-        )
-        if not consumer:
-            return None
-        if 'email' in update_data and update_data['email'] is not None:
-            existing_consumer = await ConsumerRepository.get_consumer_by_email(
-                update_data["email"],
+    ) -> ConsumerRecord | None:
+        values = {
+            key: value
+            for key, value in update_data.items()
+            if value is not None
+        }
+        if not values:
+            return await ConsumerRepository.get_consumer_record(
+                consumer_id,
                 db,
             )
-            if existing_consumer and existing_consumer.id != consumer_id:
-                raise ValueError("Consumer with this email already exists")
-
-        for key, value in update_data.items():
-            if value is not None:
-                setattr(consumer, key, value)
 
-        await db.commit()
-        await db.refresh(consumer)
-        return consumer
-
-    @staticmethod
-    async def delete_consumer(consumer_id: str, db: AsyncSession):
-        consumer = await ConsumerRepository.get_consumer_by_id(
-            consumer_id,
-            db,
+        updated = (
+            update(Consumer)
+            .where(Consumer.id == consumer_id)
+            .values(**values)
+            .returning(Consumer.id, Consumer.name, Consumer.email)
+            .cte("updated")
         )
-        if not consumer:
+        try:
+            result = await db.execute(with_favorites(updated))
+            records = group_records(result.all())
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            raise ValueError("Consumer with this email already exists")
+        if not records:
             return None
+        await consumer_cache.invalidate(consumer_id)
+        return records[0]
 
-        await db.delete(consumer)
+    @staticmethod
+    async def delete_consumer(
+        consumer_id: UUID, db: AsyncSession
+    ) -> UUID | None:
+        # Favorites go with the ON DELETE CASCADE foreign key.
+        result = await db.execute(
+            delete(Consumer)
+            .where(Consumer.id == consumer_id)
+            .returning(Consumer.id)
+        )
+        deleted = result.scalar_one_or_none()
         await db.commit()
-        return consumer
+        if deleted is not None:
+            await consumer_cache.invalidate(consumer_id)
+        return deleted
 
     @staticmethod
-    async def get_all_consumers_with_favorites(
+    async def get_consumer_records(
         db: AsyncSession,
         skip: int = 0,
-        limit: int = 100
-    ):
-        result = await db.execute(
-            select(Consumer)
-            .options(selectinload(Consumer.favorites))
-            .offset(skip)
+        limit: int = 100,
+        after_id: UUID | None = None,
+    ) -> list[ConsumerRecord]:
+        # The page is cut on consumers first, then joined to favorites, so
+        # one statement returns the whole page.
+        page = (
+            select(Consumer.id, Consumer.name, Consumer.email)
+            .order_by(Consumer.id)
             .limit(limit)
         )
-        return result.scalars().all()
+        if after_id is not None:
+            page = page.where(Consumer.id > after_id)
+        else:
+            page = page.offset(skip)
+        result = await db.execute(with_favorites(page.subquery()))
+        return group_records(result.all())
+
+    @staticmethod
+    async def stream_consumers(
+        db: AsyncSession,
+        chunk_size: int,
+    ) -> AsyncIterator[list]:
+        # Server-side cursor: rows arrive chunk_size at a time, so memory
+        # stays flat whatever the table size.
+        result = await db.stream(
+            select(Consumer.id, Consumer.name, Consumer.email)
+            .order_by(Consumer.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        async for rows in result.partitions(chunk_size):
+            yield rows
 
     @staticmethod
     async def count_consumers(db: AsyncSession):
         result = await db.execute(select(func.count(Consumer.id)))
         return result.scalar_one()
 
+    @staticmethod
+    async def estimate_consumers(db: AsyncSession) -> int:
+        # Planner statistics: free to read, refreshed by (auto)ANALYZE.
+        result = await db.execute(
+            text(
+                "SELECT reltuples::bigint FROM pg_class "
+                "WHERE oid = to_regclass(:table)"
+            ),
+            {"table": f'"{Consumer.__tablename__}"'},
+        )
+        return result.scalar_one_or_none() or 0
+
+    @staticmethod
+    async def create_import_staging(db: AsyncSession):
+        # Session-local and dropped on commit, so concurrent imports never
+        # see each other's rows.
+        await db.execute(text(
+            f"CREATE TEMP TABLE {IMPORT_STAGING_TABLE} ("
+            " line integer NOT NULL,"
+            " name text NOT NULL,"
+            " email text NOT NULL,"
+            " product_ids text[] NOT NULL,"
+            " consumer_id uuid NOT NULL DEFAULT gen_random_uuid(),"
+            " imported boolean NOT NULL DEFAULT false"
+            ") ON COMMIT DROP"
+        ))
+
+    @staticmethod
+    async def copy_import_rows(records, db: AsyncSession) -> int:
+        connection = await db.connection()
+        raw = await connection.get_raw_connection()
+        status = await raw.driver_connection.copy_records_to_table(
+            IMPORT_STAGING_TABLE,
+            records=records,
+            columns=["line", "name", "email", "product_ids"],
+        )
+        return int(status.split()[-1])
+
+    @staticmethod
+    async def get_unknown_import_product_ids(
+        db: AsyncSession,
+        limit: int,
+    ) -> list[str]:
+        # Only the local catalog is consulted: an upload full of junk ids
+        # must not turn into one upstream call per id inside this
+        # transaction.
+        result = await db.execute(
+            text(
+                f"SELECT DISTINCT p.product_id"
+                f" FROM {IMPORT_STAGING_TABLE} s"
+                f" CROSS JOIN LATERAL unnest(s.product_ids) AS p(product_id)"
+                f" WHERE NOT EXISTS ("
+                f" SELECT 1 FROM \"Products\" pr"
+                f" WHERE pr.external_id = p.product_id"
+                f") ORDER BY p.product_id LIMIT :limit"
+            ),
+            {"limit": limit},
+        )
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def merge_import(db: AsyncSession) -> dict:
+        # The first line wins for an email repeated in the upload; emails
+        # that already exist are left untouched.
+        consumers = await db.execute(text(
+            f"WITH inserted AS ("
+            f" INSERT INTO \"Consumers\" (id, name, email)"
+            f" SELECT DISTINCT ON (email) consumer_id, name, email"
+            f" FROM {IMPORT_STAGING_TABLE} ORDER BY email, line"
+            f" ON CONFLICT (email) DO NOTHING"
+            f" RETURNING id"
+            f") UPDATE {IMPORT_STAGING_TABLE} s SET imported = true"
+            f" FROM inserted WHERE s.consumer_id = inserted.id"
+        ))
+        favorites = await db.execute(text(
+            f"INSERT INTO \"Favorites\""
+            f" (id, consumer_id, product_id, created_at)"
+            f" SELECT gen_random_uuid(), s.consumer_id, p.product_id,"
+            f" timezone('utc', now()) + p.n * interval '1 microsecond'"
+            f" FROM {IMPORT_STAGING_TABLE} s"
+            f" CROSS JOIN LATERAL unnest(s.product_ids)"
+            f" WITH ORDINALITY AS p(product_id, n)"
+            f" JOIN \"Products\" pr ON pr.external_id = p.product_id"
+            f" WHERE s.imported"
+            f" ON CONFLICT ON CONSTRAINT _consumer_product_uc DO NOTHING"
+        ))
+        return {
+            "imported": consumers.rowcount,
+            "favorites": favorites.rowcount,
+        }
+
+    @staticmethod
+    async def get_import_rejections(
+        db: AsyncSession,
+        limit: int,
+    ) -> list[dict]:
+        # An email imported from another line is a repeat within the upload;
+        # otherwise the consumer was already there before it.
+        result = await db.execute(
+            text(
+                f"SELECT s.line, s.email, EXISTS ("
+                f" SELECT 1 FROM {IMPORT_STAGING_TABLE} d"
+                f" WHERE d.email = s.email AND d.imported"
+                f") AS duplicate"
+                f" FROM {IMPORT_STAGING_TABLE} s"
+                f" WHERE NOT s.imported ORDER BY s.line LIMIT :limit"
+            ),
+            {"limit": limit},
+        )
+        return [
+            {
+                "line": line,
+                "email": email,
+                "reason": (
+                    "Duplicate email in upload" if duplicate
+                    else "Consumer with this email already exists"
+                ),
+            }
+            for line, email, duplicate in result.all()
+        ]
+
 
 class FavoriteRepository:
     @staticmethod
-    async def create_favorite(
+    async def bulk_create_favorites(
         consumer_id: UUID,
-        product_id: str,
-        db: AsyncSession
-    ):
-        favorite = Favorite(
-            consumer_id=consumer_id,
-            product_id=product_id,
-            created_at=datetime.datetime.utcnow()
-        )
-        db.add(favorite)
+        product_ids: Iterable[str],
+        db: AsyncSession,
+    ) -> list[str]:
+        product_ids = list(product_ids)
+        if not product_ids:
+            return []
+        result = await db.execute(
+            insert_favorites(consumer_id, product_ids)
+        )
         await db.commit()
-        await db.refresh(favorite)
-        return favorite
+        inserted = list(result.scalars().all())
+        if inserted:
+            await consumer_cache.invalidate(consumer_id)
+        return inserted
 
     @staticmethod
-    async def get_favorite_by_product(
+    async def remove_favorites(
         consumer_id: UUID,
-        product_id: str,
+        product_ids: Iterable[str],
         db: AsyncSession,
-    ):
+    ) -> list[str]:
+        product_ids = list(product_ids)
+        if not product_ids:
+            return []
         result = await db.execute(
-            select(Favorite).where(
-                (
-                    (Favorite.consumer_id == consumer_id)
-                    & (Favorite.product_id == product_id)
-                )
+            delete(Favorite)
+            .where(
+                (Favorite.consumer_id == consumer_id)
+                & (Favorite.product_id.in_(product_ids))
             )
+            .returning(Favorite.product_id)
         )
-        return result.scalar_one_or_none()
+        await db.commit()
+        removed = list(result.scalars().all())
+        if removed:
+            await consumer_cache.invalidate(consumer_id)
+        return removed
 
     @staticmethod
-    async def get_favorites_by_consumer_id(consumer_id: UUID, db: AsyncSession):
+    async def replace_favorites(
+        consumer_id: UUID,
+        product_ids: list[str],
+        db: AsyncSession,
+    ) -> tuple[list[str], list[str]] | None:
+        # Locking the consumer row serializes concurrent replacements of
+        # the same list and tells whether the consumer exists.
+        locked = await db.execute(
+            select(Consumer.id)
+            .where(Consumer.id == consumer_id)
+            .with_for_update()
+        )
+        if locked.scalar_one_or_none() is None:
+            await db.rollback()
+            return None
+
         result = await db.execute(
-            select(Favorite).where(Favorite.consumer_id == consumer_id)
+            delete(Favorite)
+            .where(
+                (Favorite.consumer_id == consumer_id)
+                & (Favorite.product_id.not_in(product_ids))
+            )
+            .returning(Favorite.product_id)
         )
-        return result.scalars().all()
+        removed = list(result.scalars().all())
+        added = []
+        if product_ids:
+            result = await db.execute(
+                insert_favorites(consumer_id, product_ids)
+            )
+            added = list(result.scalars().all())
+        await db.commit()
+        if added or removed:
+            await consumer_cache.invalidate(consumer_id)
+        return added, removed
 
     @staticmethod
-    async def delete_favorite(favorite: Favorite, db: AsyncSession):
-        await db.delete(favorite)
-        await db.commit()
+    async def get_product_ids_by_consumer_ids(
+        consumer_ids: Iterable[UUID],
+        db: AsyncSession,
+    ) -> dict:
+        consumer_ids = list(consumer_ids)
+        if not consumer_ids:
+            return {}
+        result = await db.execute(
+            select(Favorite.consumer_id, Favorite.product_id)
+            .where(Favorite.consumer_id.in_(consumer_ids))
+            .order_by(Favorite.consumer_id, Favorite.created_at)
+        )
+        product_ids = defaultdict(list)
+        for consumer_id, product_id in result.all():
+            product_ids[consumer_id].append(product_id)
+        return product_ids
@@ -1,4 +1,6 @@
-from sqlite3 import IntegrityError
+import csv
+import io
+from typing import Literal
 from uuid import UUID
 from fastapi import (
     APIRouter,
@@ -7,22 +9,27 @@ from fastapi import (
     Query,
     Response,
     Security,
+    UploadFile,
     status,
 )
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.domains.consumers.export import MEDIA_TYPES, export_consumers
+from src.domains.consumers.importer import import_consumers
 from src.domains.consumers.services import ConsumerService
-from src.infrastructure.services.productsService import ProductsService
 
 from .schemas import (
+    MAX_PRODUCT_IDS,
     ConsumerCreate,
     ConsumerResponse,
     ConsumerUpdate,
     FavoriteCreate,
     PaginatedConsumerResponse,
 )
-from .repositories import ConsumerRepository, FavoriteRepository
+from .repositories import ConsumerRepository
 from src.infrastructure.database import get_db
+from src.infrastructure.responses import ModelResponse
 from src.infrastructure.security import get_current_user
 
 router = APIRouter(
@@ -42,7 +49,8 @@ async def create_consumer(
     db: AsyncSession = Depends(get_db),
 ):
     try:
-        return await ConsumerRepository.create_consumer(consumer_data, db)
+        record = await ConsumerRepository.create_consumer(consumer_data, db)
+        return ConsumerResponse.from_record(record, {})
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -50,6 +58,27 @@ async def create_consumer(
         )
 
 
+@router.post("/import")
+async def import_consumers_with_favorites(
+    file: UploadFile,
+    format: Literal["ndjson", "csv"] = Query(
+        "ndjson",
+        description="ndjson: one JSON consumer per line; csv: with header",
+    ),
+    db: AsyncSession = Depends(get_db),
+):
+    lines = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+    try:
+        return await import_consumers(format, lines, db)
+    except (ValueError, csv.Error) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid upload: {e}",
+        )
+    finally:
+        lines.detach()
+
+
 @router.get("/", response_model=PaginatedConsumerResponse)
 async def list_consumers(
     page: int = Query(1, ge=1, description="Page number starting from 1"),
@@ -59,28 +88,71 @@ async def list_consumers(
         le=1000,
         description="Number of items per page (max 1000)",
     ),
+    cursor: str | None = Query(
+        None,
+        description="Opaque next_cursor from the previous page; "
+                    "when given, page is ignored",
+    ),
+    include_total: bool = Query(
+        True,
+        description="Whether to count all consumers for total/total_pages",
+    ),
     db: AsyncSession = Depends(get_db),
 ):
-    return await ConsumerService.list_with_favorites(db, page, page_size)
+    try:
+        return ModelResponse(await ConsumerService.list_with_favorites(
+            db,
+            page,
+            page_size,
+            cursor=cursor,
+            include_total=include_total,
+        ))
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+
+@router.get("/export")
+async def export_consumers_with_favorites(
+    format: Literal["ndjson", "csv"] = Query(
+        "ndjson",
+        description="ndjson: one JSON consumer per line; csv: one row each",
+    ),
+    chunk_size: int = Query(
+        1000,
+        ge=1,
+        le=10000,
+        description="Consumers fetched and hydrated per round trip",
+    ),
+):
+    return StreamingResponse(
+        export_consumers(format, chunk_size),
+        media_type=MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f"attachment; filename=consumers.{format}"
+        },
+    )
 
 
 @router.get("/{consumer_id}", response_model=ConsumerResponse)
 async def retrieve_consumer(
-    consumer_id: str,
+    consumer_id: UUID,
     db: AsyncSession = Depends(get_db),
 ):
-    consumer = await ConsumerRepository.get_consumer_by_id(consumer_id, db)
-    if not consumer:
+    payload = await ConsumerService.get_consumer_payload(consumer_id, db)
+    if payload is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Consumer not found",
         )
-    return await ConsumerService.retrive_consumer(consumer)
+    return Response(payload, media_type="application/json")
 
 
 @router.put("/{consumer_id}", response_model=ConsumerResponse)
 async def update_consumer(
-    consumer_id: str,
+    consumer_id: UUID,
     update_data: ConsumerUpdate,
     db: AsyncSession = Depends(get_db),
 ):
@@ -95,7 +167,7 @@ async def update_consumer(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Consumer not found",
             )
-        return await ConsumerService.retrive_consumer(updated)
+        return await ConsumerService.retrive_consumer_record(updated, db)
     except ValueError as e:
         if "Consumer with this email already exists" in str(e):
             raise HTTPException(
@@ -107,7 +179,7 @@ async def update_consumer(
 
 @router.delete("/{consumer_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_consumer(
-    consumer_id: str,
+    consumer_id: UUID,
     db: AsyncSession = Depends(get_db),
 ):
     deleted = await ConsumerRepository.delete_consumer(consumer_id, db)
@@ -127,49 +199,59 @@ async def add_favorites(
     favorite_data: FavoriteCreate,
     db: AsyncSession = Depends(get_db),
 ):
-    consumer = await ConsumerRepository.get_consumer_by_id(consumer_id, db)
-    if not consumer:
+    if not await ConsumerRepository.consumer_exists(consumer_id, db):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Consumer not found"
         )
 
-    added = []
-    already_exists = []
-    not_found = []
+    result = await ConsumerService.add_favorites(
+        consumer_id,
+        favorite_data.product_ids,
+        db,
+    )
+    return {"message": "Favorites added successfully", **result}
 
-    for product_id in favorite_data.product_ids:
-        product = await ProductsService.get_product_by_id(product_id)
-        if not product:
-            not_found.append(product_id)
-            continue
 
-        existing = await FavoriteRepository.get_favorite_by_product(
+@router.patch(
+    "/update/favorites/{consumer_id}",
+    status_code=status.HTTP_200_OK,
+)
+async def update_favorites(
+    consumer_id: UUID,
+    favorite_data: FavoriteCreate,
+    mode: Literal["merge", "replace"] = Query(
+        "merge",
+        description="merge: add to the current favorites; "
+                    "replace: make them exactly product_ids",
+    ),
+    db: AsyncSession = Depends(get_db),
+):
+    if mode == "replace":
+        result = await ConsumerService.replace_favorites(
             consumer_id,
-            product_id,
-            db
+            favorite_data.product_ids,
+            db,
         )
-        if existing:
-            already_exists.append(product_id)
-            continue
-
-        try:
-            await FavoriteRepository.create_favorite(
-                consumer_id=consumer_id,
-                product_id=product_id,
-                db=db
+        if result is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Consumer not found"
             )
-            added.append(product_id)
-        except IntegrityError:
-            await db.rollback()
-            already_exists.append(product_id)
+        return {"message": "Favorites replaced successfully", **result}
+
+    if not await ConsumerRepository.consumer_exists(consumer_id, db):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Consumer not found"
+        )
 
-    return {
-        "message": "Favorites added successfully",
-        "added": added,
-        "already_exists": already_exists,
-        "not_found": not_found
-    }
+    result = await ConsumerService.add_favorites(
+        consumer_id,
+        favorite_data.product_ids,
+        db,
+    )
+    return {"message": "Favorites updated successfully", **result}
 
 
 @router.patch(
@@ -186,76 +268,40 @@ async def remove_favorite(
             status_code=422,
             detail="Product ID must be a numeric value"
         )
-    consumer = await ConsumerRepository.get_consumer_by_id(consumer_id, db)
-    if not consumer:
-        raise HTTPException(status_code=404, detail="Consumer not found")
-
-    product_id_int = int(product_id)
-    product = await ProductsService.get_product_by_id(product_id_int)
-    if not product:
-        raise HTTPException(status_code=404, detail="Product not found")
-
-    favorite = await FavoriteRepository.get_favorite_by_product(
+    result = await ConsumerService.remove_favorites(
         consumer_id,
-        product_id,
-        db
+        [product_id],
+        db,
     )
-    if not favorite:
+    if result is None:
+        raise HTTPException(status_code=404, detail="Consumer not found")
+    if not result["removed"]:
         raise HTTPException(status_code=404, detail="Favorite not found")
-
-    await FavoriteRepository.delete_favorite(favorite, db)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
-@router.patch(
-    "update/favorites/{consumer_id}",
+@router.delete(
+    "/{consumer_id}/favorites",
     status_code=status.HTTP_200_OK,
 )
-async def update_favorites(
+async def remove_favorites(
     consumer_id: UUID,
-    favorite_data: FavoriteCreate,
+    product_ids: list[str] = Query(
+        ...,
+        min_length=1,
+        max_length=MAX_PRODUCT_IDS,
+        description="Product ids to remove; repeat the parameter",
+    ),
     db: AsyncSession = Depends(get_db),
 ):
-    consumer = await ConsumerRepository.get_consumer_by_id(consumer_id, db)
-    if not consumer:
+    result = await ConsumerService.remove_favorites(
+        consumer_id,
+        product_ids,
+        db,
+    )
+    if result is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Consumer not found"
         )
-
-    added = []
-    already_exists = []
-    not_found = []
-
-    for product_id in favorite_data.product_ids:
-        product = await ProductsService.get_product_by_id(product_id)
-        if not product:
-            not_found.append(product_id)
-            continue
-
-        existing = await FavoriteRepository.get_favorite_by_product(
-            consumer_id,
-            product_id,
-            db
-        )
-        if existing:
-            already_exists.append(product_id)
-            continue
-
-        try:
-            await FavoriteRepository.create_favorite(
-                consumer_id=consumer_id,
-                product_id=product_id,
-                db=db
-            )
-            added.append(product_id)
-        except IntegrityError:
-            await db.rollback()
-            already_exists.append(product_id)
-
-    return {
-        "message": "Favorites updated successfully",
-        "added": added,
-        "already_exists": already_exists,
-        "not_found": not_found
-    }
+    return {"message": "Favorites removed successfully", **result}
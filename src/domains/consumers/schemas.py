@@ -3,9 +3,13 @@ import uuid
 
 from pydantic import BaseModel, Field
 
-from src.domains.consumers.models import Consumer
+from src.domains.consumers.repositories import ConsumerRecord
 from src.domains.products.schemas import ProductDetails
 
+# Per request; the replace and remove paths still expand the ids into
+# one bind parameter each.
+MAX_PRODUCT_IDS = 1000
+
 
 class ConsumerBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=255)
@@ -37,29 +41,33 @@ class ConsumerResponse(BaseModel):
     favorites: list[ProductDetails] = []
 
     @classmethod
-    def from_domain(
-        cls, consumer: Consumer, products_map: Mapping[str, dict]
+    def from_record(
+        cls, record: ConsumerRecord, products_map: Mapping[str, dict]
     ) -> "ConsumerResponse":
         favs = [
-            ProductDetails(**products_map[fav.product_id])
-            for fav in consumer.favorites
-            if fav.product_id in products_map
+            ProductDetails(**products_map[product_id])
+            for product_id in record.product_ids
+            if product_id in products_map
         ]
         return cls(
-            id=consumer.id,
-            name=consumer.name,
-            email=consumer.email,
+            id=record.id,
+            name=record.name,
+            email=record.email,
             favorites=favs
         )
 
 
 class FavoriteCreate(BaseModel):
-    product_ids: List[str] = Field(..., min_items=1)
+    product_ids: List[str] = Field(
+        ..., min_length=1, max_length=MAX_PRODUCT_IDS
+    )
 
 
 class PaginatedConsumerResponse(BaseModel):
     data: list[ConsumerResponse]
-    total: int
+    total: int | None = None
+    total_is_exact: bool = True
     page: int
     page_size: int
-    total_pages: int
+    total_pages: int | None = None
+    next_cursor: str | None = None
@@ -1,54 +1,213 @@
+import base64
+from typing import Iterable
+from uuid import UUID
+
+from pydantic_core import to_json
 from sqlalchemy.ext.asyncio import AsyncSession
-from src.domains.consumers.models import Consumer
-from src.domains.consumers.repositories import ConsumerRepository
-from src.infrastructure.services.productsService import ProductsService
+from src.config.settings import settings
+from src.domains.consumers.cache import consumer_cache
+from src.domains.consumers.repositories import (
+    ConsumerRecord,
+    ConsumerRepository,
+    FavoriteRepository,
+)
+from src.domains.products.services import ProductService
+from src.infrastructure.cache import LRUCache
 from src.domains.consumers.schemas import (
     ConsumerResponse,
     PaginatedConsumerResponse
 )
 
 
+def encode_cursor(consumer_id: UUID) -> str:
+    return base64.urlsafe_b64encode(consumer_id.bytes).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> UUID:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return UUID(bytes=base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
 class ConsumerService:
+    count_cache = LRUCache(
+        max_size=1,
+        ttl=settings.CONSUMER_COUNT_CACHE_SECONDS,
+    )
+
+    @staticmethod
+    async def count_consumers(db: AsyncSession) -> tuple[int, bool]:
+        strategy = settings.CONSUMER_COUNT_STRATEGY
+        if strategy == "estimate":
+            estimate = await ConsumerRepository.estimate_consumers(db)
+            # reltuples is -1 (or 0) until the table is first analyzed.
+            if estimate > 0:
+                return estimate, False
+        elif strategy == "cached":
+            cached = ConsumerService.count_cache.get("consumers")
+            if cached is not None:
+                return cached, False
+            total = await ConsumerRepository.count_consumers(db)
+            ConsumerService.count_cache.set("consumers", total)
+            return total, True
+        return await ConsumerRepository.count_consumers(db), True
+
     @staticmethod
     async def list_with_favorites(
-        db: AsyncSession, page: int, page_size: int
+        db: AsyncSession,
+        page: int,
+        page_size: int,
+        cursor: str | None = None,
+        include_total: bool = True,
     ) -> PaginatedConsumerResponse:
-        total = await ConsumerRepository.count_consumers(db)
-        consumers = await ConsumerRepository.get_all_consumers_with_favorites(
+        after_id = decode_cursor(cursor) if cursor else None
+        total, total_is_exact = (
+            await ConsumerService.count_consumers(db)
+            if include_total
+            else (None, False)
+        )
+        # One extra row tells whether there is a next page without counting.
+        consumers = await ConsumerRepository.get_consumer_records(
             db,
             skip=(page - 1) * page_size,
-            limit=page_size
+            limit=page_size + 1,
+            after_id=after_id,
         )
+        has_more = len(consumers) > page_size
+        consumers = consumers[:page_size]
 
         favorite_ids = {
-            fav.product_id
+            product_id
             for consumer in consumers
-            for fav in consumer.favorites
+            for product_id in consumer.product_ids
         }
 
-        products_map = {}
-        for product_id in favorite_ids:
-            product = await ProductsService.get_product_by_id(product_id)
-            if product:
-                products_map[str(product_id)] = product
+        products_map = await ProductService.get_products_map(favorite_ids, db)
 
         return PaginatedConsumerResponse(
             data=[
-                ConsumerResponse.from_domain(c, products_map)
+                ConsumerResponse.from_record(c, products_map)
                 for c in consumers
             ],
             total=total,
+            total_is_exact=total_is_exact,
             page=page,
             page_size=page_size,
-            total_pages=(total + page_size - 1) // page_size or 1,
+            total_pages=(
+                (total + page_size - 1) // page_size or 1
+                if total is not None
+                else None
+            ),
+            next_cursor=encode_cursor(consumers[-1].id) if has_more else None,
+        )
+
+    @staticmethod
+    async def retrive_consumer_record(
+        record: ConsumerRecord, db: AsyncSession
+    ) -> ConsumerResponse:
+        products_map = await ProductService.get_products_map(
+            record.product_ids,
+            db,
+        )
+        return ConsumerResponse.from_record(record, products_map)
+
+    @staticmethod
+    async def get_consumer_payload(
+        consumer_id: UUID, db: AsyncSession
+    ) -> bytes | None:
+        payload = await consumer_cache.get(consumer_id)
+        if payload is not None:
+            return payload
+
+        # Taken before the read, so a write committed meanwhile is detected.
+        generation = await consumer_cache.generation(consumer_id)
+        record = await ConsumerRepository.get_consumer_record(consumer_id, db)
+        if not record:
+            return None
+        payload = to_json(
+            await ConsumerService.retrive_consumer_record(record, db)
         )
+        await consumer_cache.set(consumer_id, payload, generation)
+        return payload
+
+    @staticmethod
+    async def add_favorites(
+        consumer_id: UUID, product_ids: Iterable[str], db: AsyncSession
+    ) -> dict:
+        product_ids = list(product_ids)
+        products_map = await ProductService.get_products_map(product_ids, db)
+
+        valid_ids = list(dict.fromkeys(
+            product_id
+            for product_id in product_ids
+            if str(product_id) in products_map
+        ))
+        inserted = set(await FavoriteRepository.bulk_create_favorites(
+            consumer_id,
+            valid_ids,
+            db,
+        ))
+
+        added = []
+        already_exists = []
+        not_found = []
+        for product_id in product_ids:
+            if str(product_id) not in products_map:
+                not_found.append(product_id)
+            elif product_id in inserted:
+                added.append(product_id)
+                inserted.discard(product_id)
+            else:
+                already_exists.append(product_id)
+        return {
+            "added": added,
+            "already_exists": already_exists,
+            "not_found": not_found,
+        }
 
     @staticmethod
-    async def retrive_consumer(consumer: Consumer) -> ConsumerResponse:
-        products_map = {}
-        for fav in consumer.favorites:
-            product = await ProductsService.get_product_by_id(fav.product_id)
-            if product:
-                products_map[str(fav.product_id)] = product
-
-        return ConsumerResponse.from_domain(consumer, products_map)
+    async def remove_favorites(
+        consumer_id: UUID, product_ids: Iterable[str], db: AsyncSession
+    ) -> dict | None:
+        # Removing a row we own needs no upstream check; the consumer is
+        # only looked up when nothing matched, to tell the 404s apart.
+        product_ids = list(dict.fromkeys(product_ids))
+        removed = set(await FavoriteRepository.remove_favorites(
+            consumer_id,
+            product_ids,
+            db,
+        ))
+        if not removed and not await ConsumerRepository.consumer_exists(
+            consumer_id, db
+        ):
+            return None
+        return {
+            "removed": [p for p in product_ids if p in removed],
+            "not_found": [p for p in product_ids if p not in removed],
+        }
+
+    @staticmethod
+    async def replace_favorites(
+        consumer_id: UUID, product_ids: Iterable[str], db: AsyncSession
+    ) -> dict | None:
+        product_ids = list(dict.fromkeys(product_ids))
+        products_map = await ProductService.get_products_map(product_ids, db)
+        valid_ids = [p for p in product_ids if str(p) in products_map]
+
+        result = await FavoriteRepository.replace_favorites(
+            consumer_id,
+            valid_ids,
+            db,
+        )
+        if result is None:
+            return None
+        added, removed = result
+        added = set(added)
+        return {
+            "added": [p for p in valid_ids if p in added],
+            "removed": removed,
+            "unchanged": [p for p in valid_ids if p not in added],
+            "not_found": [p for p in product_ids if p not in valid_ids],
+        }
@@ -0,0 +1,75 @@
+import uuid
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Float,
+    Index,
+    Integer,
+    String,
+    Text,
+)
+from sqlalchemy.dialects.postgresql import UUID
+
+from src.infrastructure.database import Base
+
+
+class Product(Base):
+    __tablename__ = "Products"
+
+    id = Column(
+        UUID(),
+        primary_key=True,
+        default=uuid.uuid4
+    )
+    external_id = Column(
+        String,
+        unique=True,
+        index=True,
+        nullable=False
+    )
+    title = Column(String, nullable=False)
+    price = Column(Float, nullable=False)
+    description = Column(Text)
+    category = Column(String)
+    image = Column(String)
+    rating_rate = Column(Float)
+    rating_count = Column(Integer)
+    content_hash = Column(String(64), nullable=False)
+    updated = Column(Boolean, default=False, nullable=False)
+    last_synced_at = Column(DateTime)
+
+    def as_dict(self) -> dict:
+        rating = None
+        if self.rating_rate is not None and self.rating_count is not None:
+            rating = {"rate": self.rating_rate, "count": self.rating_count}
+        return {
+            "id": (
+                int(self.external_id)
+                if self.external_id.isdigit()
+                else self.external_id
+            ),
+            "title": self.title,
+            "price": self.price,
+            "description": self.description,
+            "category": self.category,
+            "image": self.image,
+            "rating": rating,
+        }
+
+
+class ProductFavoriteCount(Base):
+    # Maintained by the favorites_product_counts_* triggers on "Favorites".
+    __tablename__ = "ProductFavoriteCounts"
+
+    product_id = Column(String, primary_key=True)
+    favorites_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index(
+            'ix_ProductFavoriteCounts_favorites_count',
+            favorites_count.desc(),
+            product_id,
+        ),
+    )
@@ -0,0 +1,113 @@
+from typing import Iterable
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.domains.products.models import Product, ProductFavoriteCount
+
+IN_CATALOG = Product.external_id == ProductFavoriteCount.product_id
+
+
+class ProductRepository:
+    @staticmethod
+    async def count_products(db: AsyncSession) -> int:
+        result = await db.execute(select(func.count(Product.id)))
+        return result.scalar_one()
+
+    @staticmethod
+    async def get_products_page(
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 10,
+    ):
+        # External ids are numeric strings; ordering by length first keeps
+        # the upstream numeric order ("2" before "10").
+        result = await db.execute(
+            select(Product)
+            .order_by(func.length(Product.external_id), Product.external_id)
+            .offset(skip)
+            .limit(limit)
+        )
+        return result.scalars().all()
+
+    @staticmethod
+    async def get_products_by_external_ids(
+        external_ids: Iterable[str],
+        db: AsyncSession,
+    ):
+        external_ids = list(external_ids)
+        if not external_ids:
+            return []
+        result = await db.execute(
+            select(Product).where(Product.external_id.in_(external_ids))
+        )
+        return result.scalars().all()
+
+    @staticmethod
+    async def get_content_hashes(db: AsyncSession) -> dict[str, str]:
+        result = await db.execute(
+            select(Product.external_id, Product.content_hash)
+        )
+        return dict(result.all())
+
+    @staticmethod
+    async def upsert_products(rows: list[dict], db: AsyncSession):
+        if not rows:
+            return
+        stmt = insert(Product).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Product.external_id],
+            set_={
+                column: stmt.excluded[column]
+                for column in rows[0]
+                if column not in ("id", "external_id")
+            },
+        )
+        await db.execute(stmt)
+
+    @staticmethod
+    async def clear_updated_flags(
+        changed_external_ids: Iterable[str],
+        db: AsyncSession,
+    ):
+        await db.execute(
+            update(Product)
+            .where(
+                Product.updated.is_(True),
+                Product.external_id.not_in(list(changed_external_ids)),
+            )
+            .values(updated=False)
+        )
+
+    @staticmethod
+    async def count_popular_products(db: AsyncSession) -> int:
+        result = await db.execute(
+            select(func.count())
+            .select_from(ProductFavoriteCount)
+            .join(Product, IN_CATALOG)
+            .where(ProductFavoriteCount.favorites_count > 0)
+        )
+        return result.scalar_one()
+
+    @staticmethod
+    async def get_popular_products(
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 10,
+    ) -> list[tuple[Product, int]]:
+        # Only products in the local catalog are ranked, so every page is
+        # full and agrees with count_popular_products.
+        result = await db.execute(
+            select(Product, ProductFavoriteCount.favorites_count)
+            .select_from(ProductFavoriteCount)
+            .join(Product, IN_CATALOG)
+            .where(ProductFavoriteCount.favorites_count > 0)
+            .order_by(
+                ProductFavoriteCount.favorites_count.desc(),
+                ProductFavoriteCount.product_id,
+            )
+            .offset(skip)
+            .limit(limit)
+        )
+        return [tuple(row) for row in result.all()]
@@ -1,7 +1,13 @@
-from fastapi import APIRouter, Query, Security
+from fastapi import APIRouter, Depends, Query, Security
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.domains.products.schemas import PaginatedProductResponse
+from src.domains.products.schemas import (
+    PaginatedPopularProductResponse,
+    PaginatedProductResponse,
+)
 from src.domains.products.services import ProductService
+from src.infrastructure.database import get_db
+from src.infrastructure.responses import ModelResponse
 from src.infrastructure.security import get_current_user
 
 router = APIRouter(
@@ -20,5 +26,22 @@ async def get_available_products(
         le=100,
         description="Number of items per page (max 100)",
     ),
+    db: AsyncSession = Depends(get_db),
+):
+    return ModelResponse(
+        await ProductService.get_available_products(db, page, page_size)
+    )
+
+
+@router.get("/popular", response_model=PaginatedPopularProductResponse)
+async def get_popular_products(
+    page: int = Query(1, ge=1, description="Page number starting from 1"),
+    page_size: int = Query(
+        10,
+        ge=1,
+        le=100,
+        description="Number of items per page (max 100)",
+    ),
+    db: AsyncSession = Depends(get_db),
 ):
-    return await ProductService.get_available_products(page, page_size)
+    return await ProductService.get_popular_products(db, page, page_size)
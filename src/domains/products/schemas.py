@@ -11,7 +11,7 @@ class ProductDetails(BaseModel):
     id: int
     title: str
     price: float
-    image: str
+    image: Optional[str] = None
     rating: Optional[ProductRating] = None
 
     model_config = ConfigDict(from_attributes=True)
@@ -23,3 +23,15 @@ class PaginatedProductResponse(BaseModel):
     page: int
     page_size: int
     total_pages: int
+
+
+class PopularProduct(ProductDetails):
+    favorites_count: int
+
+
+class PaginatedPopularProductResponse(BaseModel):
+    data: list[PopularProduct]
+    total: int
+    page: int
+    page_size: int
+    total_pages: int
@@ -1,30 +1,43 @@
-from typing import Dict, Any
+from typing import Dict, Any, Iterable
+
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.infrastructure.services.productsService import ProductsService
-from src.domains.products.schemas import ProductDetails
+from src.domains.products.repositories import ProductRepository
+from src.domains.products.schemas import PopularProduct, ProductDetails
 
 
 class ProductService:
     @staticmethod
     async def get_available_products(
-        page: int, page_size: int
+        db: AsyncSession, page: int, page_size: int
     ) -> Dict[str, Any]:
-        products = await ProductsService.get_products()
-        total = len(products)
         start = (page - 1) * page_size
-        end = start + page_size
-        slice_ = products[start:end]
-
-        items = [
-            ProductDetails(
-                id=p["id"],
-                title=p["title"],
-                price=p["price"],
-                image=p["image"],
-                review=p.get("rating"),
+        total = await ProductRepository.count_products(db)
+        if total:
+            products = await ProductRepository.get_products_page(
+                db,
+                skip=start,
+                limit=page_size,
             )
-            for p in slice_
-        ]
+            items = [ProductDetails(**p.as_dict()) for p in products]
+        else:
+            # The local catalog has not been synced yet.
+            products = await ProductsService.get_products()
+            total = len(products)
+            end = start + page_size
+            slice_ = products[start:end]
+
+            items = [
+                ProductDetails(
+                    id=p["id"],
+                    title=p["title"],
+                    price=p["price"],
+                    image=p["image"],
+                    review=p.get("rating"),
+                )
+                for p in slice_
+            ]
         total_pages = (total + page_size - 1) // page_size or 1
         return {
             "data": items,
@@ -33,3 +46,44 @@ class ProductService:
             "page_size": page_size,
             "total_pages": total_pages,
         }
+
+    @staticmethod
+    async def get_popular_products(
+        db: AsyncSession, page: int, page_size: int
+    ) -> Dict[str, Any]:
+        total = await ProductRepository.count_popular_products(db)
+        ranking = await ProductRepository.get_popular_products(
+            db,
+            skip=(page - 1) * page_size,
+            limit=page_size,
+        )
+        items = [
+            PopularProduct(**product.as_dict(), favorites_count=favorites_count)
+            for product, favorites_count in ranking
+        ]
+        return {
+            "data": items,
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "total_pages": (total + page_size - 1) // page_size or 1,
+        }
+
+    @staticmethod
+    async def get_products_map(
+        product_ids: Iterable, db: AsyncSession
+    ) -> Dict[str, dict]:
+        wanted = {str(product_id) for product_id in product_ids}
+        products = await ProductRepository.get_products_by_external_ids(
+            wanted,
+            db,
+        )
+        products_map = {p.external_id: p.as_dict() for p in products}
+
+        # Products that are not synced locally yet still resolve upstream.
+        missing = wanted - products_map.keys()
+        if missing:
+            products_map.update(
+                await ProductsService.get_products_by_ids(missing)
+            )
+        return products_map
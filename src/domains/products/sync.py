@@ -0,0 +1,104 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import uuid
+from datetime import datetime
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config.settings import settings
+from src.domains.products.repositories import ProductRepository
+from src.infrastructure.database import AsyncSessionLocal
+from src.infrastructure.services.productsService import ProductsService
+
+
+def content_hash(product: dict) -> str:
+    payload = json.dumps(product, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def to_row(product: dict, digest: str, synced_at: datetime) -> dict:
+    rating = product.get("rating") or {}
+    return {
+        "id": uuid.uuid4(),
+        "external_id": str(product["id"]),
+        "title": product["title"],
+        "price": product["price"],
+        "description": product.get("description"),
+        "category": product.get("category"),
+        "image": product.get("image"),
+        "rating_rate": rating.get("rate"),
+        "rating_count": rating.get("count"),
+        "content_hash": digest,
+        "updated": True,
+        "last_synced_at": synced_at,
+    }
+
+
+async def sync_products(db: AsyncSession) -> dict:
+    products = await ProductsService.fetch_products()
+    known_hashes = await ProductRepository.get_content_hashes(db)
+    synced_at = datetime.utcnow()
+
+    changed = []
+    for product in products:
+        digest = content_hash(product)
+        if known_hashes.get(str(product["id"])) != digest:
+            changed.append(to_row(product, digest, synced_at))
+
+    await ProductRepository.upsert_products(changed, db)
+    await ProductRepository.clear_updated_flags(
+        [row["external_id"] for row in changed],
+        db,
+    )
+    await db.commit()
+    return {
+        "fetched": len(products),
+        "changed": len(changed),
+        "unchanged": len(products) - len(changed),
+    }
+
+
+async def run_sync() -> dict:
+    async with AsyncSessionLocal() as db:
+        return await sync_products(db)
+
+
+async def run_periodic_sync(interval: float):
+    while True:
+        try:
+            stats = await run_sync()
+            print("Products sync finished:", stats)
+        except Exception as e:
+            print("Products sync failed:", e)
+        await asyncio.sleep(interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Sync the local products table with the products API."
+    )
+    parser.add_argument(
+        "--loop",
+        action="store_true",
+        help="Keep running, syncing every PRODUCTS_SYNC_INTERVAL_SECONDS.",
+    )
+    args = parser.parse_args()
+
+    async def run():
+        try:
+            if args.loop:
+                await run_periodic_sync(
+                    settings.PRODUCTS_SYNC_INTERVAL_SECONDS
+                )
+            else:
+                print("Products sync finished:", await run_sync())
+        finally:
+            await ProductsService.shutdown()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -9,12 +9,11 @@ from src.infrastructure.database import Base
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(UUID(), primary_key=True, index=True, default=uuid.uuid4)
+    id = Column(UUID(), primary_key=True, default=uuid.uuid4)
     email = Column(String, unique=True, index=True)
     hashed_password = Column(
         String(128),
-        name="hashed_password",
-        index=True
+        name="hashed_password"
     )
     is_active = Column(
         Boolean,
@@ -1,7 +1,7 @@
 from sqlalchemy import select
 from src.domains.users.models import User
 from src.infrastructure.database import get_db
-from src.infrastructure.security import get_password_hash
+from src.infrastructure.security import get_password_hash_async
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
@@ -13,7 +13,7 @@ class UserRepository:
             if existing_user:
                 raise ValueError("User already exists")
 
-            hashed_password = get_password_hash(user_data.password)
+            hashed_password = await get_password_hash_async(user_data.password)
             new_user = User(
                 email=user_data.email,
                 hashed_password=hashed_password,
@@ -4,7 +4,7 @@ from src.infrastructure.database import get_db
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.infrastructure.security import (
     create_access_token,
-    get_password_hash,
+    get_password_hash_async,
 )
 from .schemas import (
     UserCreateRequest,
@@ -56,7 +56,7 @@ async def register(
         )
     new_user = User(
         email=user_data.email,
-        hashed_password=get_password_hash(user_data.password),
+        hashed_password=await get_password_hash_async(user_data.password),
         is_active=True
     )
     db.add(new_user)
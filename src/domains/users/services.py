@@ -1,4 +1,4 @@
-from src.infrastructure.security import verify_password
+from src.infrastructure.security import verify_password_async
 from src.domains.users.repositories import UserRepository
 from src.domains.users.schemas import UserCreate
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -12,6 +12,8 @@ class UserService:
     @staticmethod
     async def authenticate_user(email: str, password: str, db: AsyncSession):
         user = await UserRepository.get_user_by_email(email, db)
-        if not user or not verify_password(password, user.hashed_password):
+        if not user or not await verify_password_async(
+            password, user.hashed_password
+        ):
             return None
         return user
@@ -1,10 +1,17 @@
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from sqlalchemy import text
 
 from src.config.settings import Settings
+from src.domains.consumers.cache import consumer_cache
+from src.domains.products.sync import run_periodic_sync
 from src.infrastructure.database import engine
+from src.infrastructure.instrumentation import instrument_app
+from src.infrastructure.security import password_hasher
+from src.infrastructure.services.productsService import ProductsService
 from src.routers import main_router
 
 settings = Settings()
@@ -18,14 +25,31 @@ async def lifespan(app: FastAPI):
         print("Database connection sucess!")
     except Exception as e:
         print("Erro to connect:", e)
-    yield
+    await ProductsService.startup()
+    sync_task = None
+    if settings.PRODUCTS_SYNC_ENABLED:
+        sync_task = asyncio.create_task(
+            run_periodic_sync(settings.PRODUCTS_SYNC_INTERVAL_SECONDS)
+        )
+    try:
+        yield
+    finally:
+        if sync_task is not None:
+            sync_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await sync_task
+        await ProductsService.shutdown()
+        await consumer_cache.close()
+        password_hasher.shutdown()
 
 
 app = FastAPI(
     title="API of favorite products",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     swagger_ui_parameters={"docExpansion": "none"},
     # dependencies=[Depends(security_scheme)]
 )
 
 app.include_router(main_router)
+instrument_app(app, engine)
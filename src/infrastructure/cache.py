@@ -0,0 +1,280 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+
+class LRUCache:
+    def __init__(self, max_size: int, ttl: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = float("inf") if ttl is None else time.monotonic() + ttl
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.pop(key, None)
+        return default if entry is None else entry[0]
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class SWRCache(LRUCache):
+    # Expired entries keep being served for `stale_ttl` seconds while a
+    # single background task per key reloads them.
+    def __init__(self, max_size: int, ttl: float, stale_ttl: float = 0.0):
+        super().__init__(max_size, ttl)
+        self.stale_ttl = stale_ttl
+        self.stale_hits = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self._refreshing: dict = {}
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, expires_at = entry
+            now = time.monotonic()
+            if now < expires_at:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            if now < expires_at + self.stale_ttl:
+                self._entries.move_to_end(key)
+                self.stale_hits += 1
+                self._schedule_refresh(key, loader)
+                return value
+
+        # Expired entries are only replaced once the loader succeeds, so
+        # peek() can still hand out the last known-good value on failure.
+        self.misses += 1
+        value = await loader()
+        if value is None:
+            self._entries.pop(key, None)
+        else:
+            self.set(key, value)
+        return value
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        return default if entry is None else entry[0]
+
+    def _schedule_refresh(self, key, loader):
+        if key in self._refreshing:
+            return
+        task = asyncio.get_running_loop().create_task(
+            self._refresh(key, loader)
+        )
+        self._refreshing[key] = task
+
+    async def _refresh(self, key, loader):
+        try:
+            value = await loader()
+            if value is None:
+                self._entries.pop(key, None)
+            else:
+                self.set(key, value)
+            self.refreshes += 1
+        except Exception:
+            self.refresh_errors += 1
+        finally:
+            self._refreshing.pop(key, None)
+
+    def clear(self):
+        super().clear()
+        for task in self._refreshing.values():
+            task.cancel()
+        self._refreshing.clear()
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        stats.update(
+            stale_hits=self.stale_hits,
+            refreshes=self.refreshes,
+            refresh_errors=self.refresh_errors,
+            refreshing=len(self._refreshing),
+        )
+        return stats
+
+
+class MemoryBackend:
+    # Per-process: each worker keeps (and invalidates) its own copy.
+    name = "memory"
+
+    def __init__(self, max_size: int):
+        self.entries = LRUCache(max_size)
+        # Generations outlive the entries they guard, so they get more room.
+        self.generations = LRUCache(max_size * 2)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self.entries.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        self.entries.set(key, value, ttl)
+
+    async def generation(self, key: str) -> int:
+        return self.generations.get(key, 0)
+
+    async def bump(self, key: str, ttl: Optional[float] = None):
+        self.generations.set(key, self.generations.get(key, 0) + 1)
+
+    async def set_if_generation(
+        self,
+        key: str,
+        value: bytes,
+        ttl: Optional[float],
+        generation_key: str,
+        generation: int,
+    ) -> bool:
+        # No await between the check and the write: atomic in-process.
+        if self.generations.get(generation_key, 0) != generation:
+            return False
+        self.entries.set(key, value, ttl)
+        return True
+
+    async def delete(self, key: str):
+        self.entries.pop(key)
+
+    async def clear(self):
+        self.entries.clear()
+        self.generations.clear()
+
+    async def close(self):
+        pass
+
+    def stats(self) -> dict:
+        return self.entries.stats()
+
+
+# Writes the entry only if the generation key still holds the value read
+# before the load; check and write run atomically on the server.
+SET_IF_GENERATION = """
+if tonumber(redis.call('GET', KEYS[2]) or '0') ~= tonumber(ARGV[2]) then
+    return 0
+end
+if tonumber(ARGV[3]) > 0 then
+    redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[3])
+else
+    redis.call('SET', KEYS[1], ARGV[1])
+end
+return 1
+"""
+
+
+class RedisBackend:
+    # Shared by every worker, so an invalidation in one is seen by all.
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = ""):
+        try:
+            from redis import asyncio as redis
+        except ImportError:
+            raise RuntimeError(
+                "The redis cache backend needs the redis package installed"
+            )
+        self.client = redis.from_url(url)
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        await self.client.set(
+            self.prefix + key,
+            value,
+            px=int(ttl * 1000) if ttl else None,
+        )
+
+    async def generation(self, key: str) -> int:
+        return int(await self.client.get(self.prefix + key) or 0)
+
+    async def bump(self, key: str, ttl: Optional[float] = None):
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.incr(self.prefix + key)
+            if ttl:
+                pipe.pexpire(self.prefix + key, int(ttl * 1000))
+            await pipe.execute()
+
+    async def set_if_generation(
+        self,
+        key: str,
+        value: bytes,
+        ttl: Optional[float],
+        generation_key: str,
+        generation: int,
+    ) -> bool:
+        return bool(await self.client.eval(
+            SET_IF_GENERATION,
+            2,
+            self.prefix + key,
+            self.prefix + generation_key,
+            value,
+            generation,
+            int(ttl * 1000) if ttl else 0,
+        ))
+
+    async def delete(self, key: str):
+        await self.client.delete(self.prefix + key)
+
+    async def clear(self):
+        async for key in self.client.scan_iter(match=self.prefix + "*"):
+            await self.client.delete(key)
+
+    async def close(self):
+        await self.client.aclose()
+
+    def stats(self) -> dict:
+        return {}
+
+
+def build_backend(
+    name: str,
+    max_size: int,
+    redis_url: Optional[str] = None,
+    prefix: str = "",
+):
+    if name == "none":
+        return None
+    if name == "redis":
+        if not redis_url:
+            raise RuntimeError("REDIS_URL is required for the redis backend")
+        return RedisBackend(redis_url, prefix)
+    return MemoryBackend(max_size)
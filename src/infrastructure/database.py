@@ -1,12 +1,29 @@
 import importlib
 import pathlib
+import time
 
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from src.config.settings import settings
+from src.infrastructure.metrics import db_pool_checkout_wait
 
-engine = create_async_engine(settings.DATABASE_URL)
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    # Includes opening a new connection when the pool has none idle.
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_checkout_wait.observe(time.perf_counter() - started)
+
+
+engine = create_async_engine(
+    settings.DATABASE_URL,
+    poolclass=TimedQueuePool,
+)
 AsyncSessionLocal = sessionmaker(
     bind=engine, class_=AsyncSession, expire_on_commit=False, autoflush=False
 )
@@ -0,0 +1,226 @@
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from fastapi import APIRouter, FastAPI
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.config.settings import settings
+from src.domains.consumers.cache import consumer_cache
+from src.infrastructure.metrics import (
+    db_queries,
+    db_query_duration,
+    http_request_duration,
+    http_requests,
+    http_requests_in_flight,
+    registry,
+    stats_gauges,
+)
+from src.infrastructure.security import password_hasher, token_cache
+from src.infrastructure.services.productsService import ProductsService
+
+
+class QueryStats:
+    def __init__(self, parent: "QueryStats | None" = None):
+        self.parent = parent
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Counter = Counter()
+
+    @property
+    def duplicates(self) -> int:
+        # The same SQL text run more than once is the shape of an N+1.
+        return self.count - len(self.statements)
+
+    def repeated(self) -> dict[str, int]:
+        return {sql: n for sql, n in self.statements.items() if n > 1}
+
+    def record(self, statement: str, seconds: float):
+        stats = self
+        while stats is not None:
+            stats.count += 1
+            stats.seconds += seconds
+            stats.statements[statement] += 1
+            stats = stats.parent
+
+
+# Statements run by the request (or test block) being tracked, if any.
+request_queries: ContextVar[QueryStats | None] = ContextVar(
+    "request_queries", default=None
+)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    # Nested blocks also count towards the enclosing ones.
+    stats = QueryStats(parent=request_queries.get())
+    token = request_queries.set(stats)
+    try:
+        yield stats
+    finally:
+        request_queries.reset(token)
+
+
+def route_name(scope: dict) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    # Plain ASGI rather than BaseHTTPMiddleware: no extra task per request,
+    # and the timer stops after the last body chunk, so streaming and
+    # serialization are included.
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        queries = request_queries.get()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc(method=method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_requests_in_flight.dec(method=method)
+            route = route_name(scope)
+            http_requests.inc(method=method, route=route, status=status_code)
+            http_request_duration.observe(elapsed, method=method, route=route)
+            if queries is not None:
+                db_queries.observe(queries.count, route=route)
+                db_query_duration.observe(queries.seconds, route=route)
+
+
+class QueryStatsMiddleware:
+    def __init__(self, app, debug_header: bool = False):
+        self.app = app
+        self.debug_header = debug_header
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as queries:
+            async def send_wrapper(message):
+                if (
+                    self.debug_header
+                    and message["type"] == "http.response.start"
+                ):
+                    # Statements run while streaming the body come too
+                    # late for the header; the metrics still see them.
+                    message = {
+                        **message,
+                        "headers": [
+                            *message.get("headers", []),
+                            *query_headers(queries),
+                        ],
+                    }
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+
+def query_headers(queries: QueryStats) -> list[tuple[bytes, bytes]]:
+    return [
+        (b"x-db-query-count", str(queries.count).encode()),
+        (b"x-db-query-time-ms", f"{queries.seconds * 1000:.2f}".encode()),
+        (b"x-db-duplicate-queries", str(queries.duplicates).encode()),
+    ]
+
+
+def before_cursor_execute(conn, cursor, statement, params, context, many):
+    # Kept on the execution context, which is dropped with the statement,
+    # so a failed statement leaves nothing behind on the connection.
+    context._query_start = time.perf_counter()
+
+
+def after_cursor_execute(conn, cursor, statement, params, context, many):
+    started = context._query_start
+    queries = request_queries.get()
+    if queries is not None:
+        queries.record(statement, time.perf_counter() - started)
+
+
+def instrument_engine(engine: AsyncEngine):
+    sync_engine = engine.sync_engine
+    if not event.contains(
+        sync_engine, "before_cursor_execute", before_cursor_execute
+    ):
+        event.listen(
+            sync_engine, "before_cursor_execute", before_cursor_execute
+        )
+        event.listen(sync_engine, "after_cursor_execute", after_cursor_execute)
+
+
+def collect_service_stats():
+    yield from stats_gauges(
+        "products_service",
+        "Products API client cache, breaker and budget state.",
+        ProductsService.stats(),
+    )
+    yield from stats_gauges(
+        "password_hasher",
+        "Password hashing thread pool state.",
+        password_hasher.stats(),
+    )
+    yield from stats_gauges(
+        "token_cache",
+        "Verified JWT cache state.",
+        token_cache.stats(),
+    )
+    yield from stats_gauges(
+        "consumer_cache",
+        "Rendered consumer responses cache state.",
+        consumer_cache.stats(),
+    )
+
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(
+        registry.render(),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
+def instrument_app(app: FastAPI, engine: AsyncEngine):
+    instrument_engine(engine)
+    if settings.METRICS_ENABLED:
+        pool = engine.sync_engine.pool
+        registry.add_collector(lambda: stats_gauges(
+            "db_pool",
+            "Connection pool state.",
+            {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+            },
+        ))
+        registry.add_collector(collect_service_stats)
+        app.add_middleware(MetricsMiddleware)
+        app.include_router(metrics_router)
+    # Added last so it wraps the metrics middleware and owns the stats.
+    app.add_middleware(
+        QueryStatsMiddleware,
+        debug_header=settings.SQL_DEBUG_HEADER,
+    )
@@ -0,0 +1,236 @@
+import bisect
+import math
+from typing import Callable, Iterable, Iterator
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(
+            key,
+            str(value)
+            .replace("\\", "\\\\")
+            .replace("\n", "\\n")
+            .replace('"', '\\"'),
+        )
+        for key, value in labels.items()
+    )
+    return "{" + pairs + "}"
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: dict = {}
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels[label]) for label in self.labels)
+
+    def header(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+
+    def samples(self) -> Iterator[tuple[str, dict, float]]:
+        for key, value in self._values.items():
+            yield self.name, dict(zip(self.labels, key)), value
+
+    def render(self) -> list[str]:
+        return self.header() + [
+            f"{name}{format_labels(labels)} {format_value(value)}"
+            for name, labels, value in self.samples()
+        ]
+
+    def clear(self):
+        self._values.clear()
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        series = self._values.get(key)
+        if series is None:
+            # Per-bucket counts, then sum and count.
+            series = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series[index] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def count(self, **labels) -> int:
+        series = self._values.get(self._key(labels))
+        return 0 if series is None else series[-1]
+
+    def samples(self) -> Iterator[tuple[str, dict, float]]:
+        for key, series in self._values.items():
+            labels = dict(zip(self.labels, key))
+            cumulative = 0
+            for bound, observed in zip(self.buckets, series):
+                cumulative += observed
+                yield (
+                    f"{self.name}_bucket",
+                    {**labels, "le": format_value(bound)},
+                    cumulative,
+                )
+            yield f"{self.name}_bucket", {**labels, "le": "+Inf"}, series[-1]
+            yield f"{self.name}_sum", labels, series[-2]
+            yield f"{self.name}_count", labels, series[-1]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+        self._collectors: list[Callable[[], Iterable[Metric]]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels=()) -> Counter:
+        return self.register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels=()) -> Gauge:
+        return self.register(Gauge(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels=(), **kwargs):
+        return self.register(Histogram(name, help, labels, **kwargs))
+
+    def add_collector(self, collector: Callable[[], Iterable[Metric]]):
+        # Collectors build gauges on scrape from objects that already keep
+        # their own stats(), so the hot paths are not touched twice.
+        self._collectors.append(collector)
+
+    def collect(self) -> Iterator[Metric]:
+        yield from self._metrics.values()
+        for collector in self._collectors:
+            yield from collector()
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.collect():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        for metric in self._metrics.values():
+            metric.clear()
+
+
+def stats_gauges(prefix: str, help: str, stats: dict) -> list[Gauge]:
+    # Numbers become one gauge each; strings (such as a breaker state)
+    # become a gauge labelled with the value, set to 1.
+    gauges = []
+    for key, value in stats.items():
+        name = f"{prefix}_{key}"
+        if isinstance(value, dict):
+            gauges.extend(stats_gauges(name, help, value))
+        elif isinstance(value, str):
+            gauge = Gauge(name, help, labels=(key,))
+            gauge.set(1, **{key: value})
+            gauges.append(gauge)
+        elif isinstance(value, (int, float)):
+            gauge = Gauge(name, help)
+            gauge.set(value)
+            gauges.append(gauge)
+    return gauges
+
+
+registry = Registry()
+
+http_requests = registry.counter(
+    "http_requests_total",
+    "HTTP requests by route template and status code.",
+    labels=("method", "route", "status"),
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "Time until the last byte of the response was sent.",
+    labels=("method", "route"),
+)
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight",
+    "Requests currently being served.",
+    labels=("method",),
+)
+upstream_requests = registry.counter(
+    "products_upstream_requests_total",
+    "Requests sent to the products API, hedges and retries included.",
+    labels=("status",),
+)
+upstream_request_duration = registry.histogram(
+    "products_upstream_request_duration_seconds",
+    "Latency of single requests to the products API.",
+)
+upstream_errors = registry.counter(
+    "products_upstream_errors_total",
+    "Failed products API calls after retries, by kind.",
+    labels=("kind",),
+)
+db_queries = registry.histogram(
+    "db_queries_per_request",
+    "SQL statements executed per HTTP request.",
+    labels=("route",),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+db_query_duration = registry.histogram(
+    "db_query_seconds_per_request",
+    "Total time spent in SQL statements per HTTP request.",
+    labels=("route",),
+)
+db_pool_checkout_wait = registry.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection.",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0),
+)
@@ -0,0 +1,170 @@
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.reset()
+
+    def reset(self):
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self.consecutive_failures = 0
+        self.times_opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if (
+            self._state == self.OPEN
+            and time.monotonic() - self._opened_at >= self.reset_timeout
+        ):
+            self._state = self.HALF_OPEN
+            self._probing = False
+        return self._state
+
+    def allow_request(self) -> bool:
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probing:
+            # Let a single probe through; everyone else keeps failing fast
+            # until it reports back.
+            self._probing = True
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self):
+        self._state = self.CLOSED
+        self._probing = False
+        self.consecutive_failures = 0
+
+    def release_probe(self):
+        # Called once the probe is over whatever its outcome, so one that was
+        # cancelled or raised something unexpected does not wedge the breaker
+        # half open; the next caller becomes the probe.
+        self._probing = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if (
+            self._state == self.HALF_OPEN
+            or self.consecutive_failures >= self.failure_threshold
+        ):
+            if self._state != self.OPEN:
+                self.times_opened += 1
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+            self._probing = False
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
+
+
+class TokenBudget:
+    # Every request deposits `ratio` tokens and every extra attempt (a retry
+    # or a hedge) spends one, so extra attempts stay a bounded fraction of
+    # traffic.
+    def __init__(self, ratio: float, max_tokens: float):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self.exhausted = 0
+
+    def deposit(self):
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        self.exhausted += 1
+        return False
+
+    def reset(self):
+        self.tokens = self.max_tokens
+        self.exhausted = 0
+
+    def stats(self) -> dict:
+        return {"tokens": self.tokens, "exhausted": self.exhausted}
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    # "Full jitter": a random delay up to the capped exponential backoff.
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class LatencyWindow:
+    def __init__(self, size: int = 200):
+        self._samples = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def observe(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> float:
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Hedger:
+    def __init__(self, budget: TokenBudget):
+        self.budget = budget
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    async def run(
+        self,
+        fn: Callable[[], Awaitable[Any]],
+        delay: float,
+    ) -> Any:
+        self.budget.deposit()
+        primary = asyncio.ensure_future(fn())
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if done or not self.budget.withdraw():
+                return await primary
+
+            self.hedges += 1
+            pending.add(asyncio.ensure_future(fn()))
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> dict:
+        return {"hedges": self.hedges, "hedge_wins": self.hedge_wins}
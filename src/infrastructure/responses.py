@@ -0,0 +1,21 @@
+from typing import Any
+
+from fastapi.responses import ORJSONResponse
+import orjson
+from pydantic import BaseModel
+from pydantic_core import to_json, to_jsonable_python
+
+
+class ModelResponse(ORJSONResponse):
+    # Hot routes return their already validated models wrapped in this
+    # response, which skips FastAPI's response_model re-validation and the
+    # jsonable_encoder pass: models are serialized by pydantic-core and
+    # anything else by orjson.
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return to_json(content)
+        return orjson.dumps(
+            content,
+            default=to_jsonable_python,
+            option=orjson.OPT_NON_STR_KEYS,
+        )
@@ -1,43 +1,289 @@
+import asyncio
+import time
+from typing import Iterable
+
 from fastapi import HTTPException
 import httpx
 
+from src.config.settings import settings
+from src.infrastructure.cache import SWRCache
+from src.infrastructure.metrics import (
+    upstream_errors,
+    upstream_request_duration,
+    upstream_requests,
+)
+from src.infrastructure.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    Hedger,
+    LatencyWindow,
+    TokenBudget,
+    backoff_delay,
+)
+from src.infrastructure.singleflight import SingleFlight
+
+CATALOG_KEY = "catalog"
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, httpx.HTTPStatusError):
+        status_code = error.response.status_code
+        return status_code == 429 or status_code >= 500
+    return isinstance(error, httpx.RequestError)
+
 
 class ProductsService:
+    client: httpx.AsyncClient | None = None
+    cache = SWRCache(
+        max_size=settings.PRODUCTS_CACHE_MAX_SIZE,
+        ttl=settings.PRODUCTS_CACHE_TTL_SECONDS,
+        stale_ttl=settings.PRODUCTS_CACHE_STALE_SECONDS,
+    )
+    flights = SingleFlight()
+    breaker = CircuitBreaker(
+        failure_threshold=settings.PRODUCTS_BREAKER_FAILURE_THRESHOLD,
+        reset_timeout=settings.PRODUCTS_BREAKER_RESET_SECONDS,
+    )
+    retry_budget = TokenBudget(
+        ratio=settings.PRODUCTS_RETRY_BUDGET_RATIO,
+        max_tokens=settings.PRODUCTS_RETRY_BUDGET_MAX_TOKENS,
+    )
+    hedger = Hedger(TokenBudget(
+        ratio=settings.PRODUCTS_HEDGE_MAX_RATIO,
+        max_tokens=settings.PRODUCTS_HEDGE_BUDGET_MAX_TOKENS,
+    ))
+    latencies = LatencyWindow()
+    stale_fallbacks = 0
+
     @staticmethod
-    async def get_products() -> list:
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get("https://fakestoreapi.com/products")
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPStatusError as e:
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Error fetching products: {str(e)}",
-                )
-            except httpx.RequestError as e:
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Connection error: {str(e)}",
-                )
+    def build_client() -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            http2=settings.PRODUCTS_HTTP2,
+            limits=httpx.Limits(
+                max_connections=settings.PRODUCTS_MAX_CONNECTIONS,
+                max_keepalive_connections=(
+                    settings.PRODUCTS_MAX_KEEPALIVE_CONNECTIONS
+                ),
+                keepalive_expiry=settings.PRODUCTS_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(
+                settings.PRODUCTS_READ_TIMEOUT,
+                connect=settings.PRODUCTS_CONNECT_TIMEOUT,
+                pool=settings.PRODUCTS_CONNECT_TIMEOUT,
+            ),
+        )
+
+    @classmethod
+    async def startup(cls):
+        if cls.client is None:
+            cls.client = cls.build_client()
+
+    @classmethod
+    async def shutdown(cls):
+        if cls.client is not None:
+            await cls.client.aclose()
+            cls.client = None
+
+    @classmethod
+    def get_client(cls) -> httpx.AsyncClient:
+        # Scripts and tests may call the service without running the app
+        # lifespan, so the shared client is created on first use as well.
+        if cls.client is None:
+            cls.client = cls.build_client()
+        return cls.client
+
+    @classmethod
+    def stats(cls) -> dict:
+        return {
+            "cache": cls.cache.stats(),
+            "flights": cls.flights.stats(),
+            "breaker": cls.breaker.stats(),
+            "retry_budget": cls.retry_budget.stats(),
+            "hedging": cls.hedger.stats(),
+            "stale_fallbacks": cls.stale_fallbacks,
+        }
 
     @staticmethod
-    async def get_product_by_id(product_id: str):
-        async with httpx.AsyncClient() as client:
+    def product_key(product_id) -> str:
+        return f"product:{product_id}"
+
+    @classmethod
+    async def get_products(cls) -> list:
+        return await cls.cache.get_or_load(
+            CATALOG_KEY,
+            lambda: cls.load(CATALOG_KEY, cls.fetch_products),
+        )
+
+    @classmethod
+    async def get_product_by_id(cls, product_id: str):
+        key = cls.product_key(product_id)
+        return await cls.cache.get_or_load(
+            key,
+            lambda: cls.load(key, lambda: cls.fetch_product(product_id)),
+        )
+
+    @classmethod
+    async def load(cls, key: str, fetch):
+        try:
+            return await cls.flights.do(key, fetch)
+        except HTTPException:
+            stale = cls.cache.peek(key)
+            if stale is None:
+                raise
+            cls.stale_fallbacks += 1
+            return stale
+
+    @classmethod
+    async def get_products_by_ids(cls, product_ids: Iterable) -> dict:
+        wanted = {str(product_id) for product_id in product_ids}
+        if not wanted:
+            return {}
+
+        products_map = {}
+        try:
+            catalog = await cls.get_products()
+        except HTTPException:
+            catalog = []
+        for product in catalog:
+            product_id = str(product["id"])
+            if product_id in wanted:
+                products_map[product_id] = product
+
+        missing = wanted - products_map.keys()
+        semaphore = asyncio.Semaphore(settings.PRODUCTS_FETCH_CONCURRENCY)
+
+        async def fetch(product_id):
+            async with semaphore:
+                return product_id, await cls.get_product_by_id(product_id)
+
+        for product_id, product in await asyncio.gather(
+            *(fetch(product_id) for product_id in missing)
+        ):
+            if product:
+                products_map[product_id] = product
+        return products_map
+
+    @classmethod
+    async def request(cls, url: str) -> httpx.Response:
+        probe = cls.breaker.state == CircuitBreaker.HALF_OPEN
+        if not cls.breaker.allow_request():
+            upstream_errors.inc(kind="circuit_open")
+            raise CircuitOpenError(url)
+        cls.retry_budget.deposit()
+        try:
+            client = cls.get_client()
+            attempt = 0
+            while True:
+                try:
+                    response = await cls.send(client, url)
+                    response.raise_for_status()
+                    cls.breaker.record_success()
+                    return response
+                except (httpx.HTTPStatusError, httpx.RequestError) as e:
+                    if not is_retryable(e):
+                        # A 4xx still means the upstream is healthy.
+                        cls.breaker.record_success()
+                        raise
+                    if (
+                        attempt < settings.PRODUCTS_MAX_RETRIES
+                        and cls.retry_budget.withdraw()
+                    ):
+                        await asyncio.sleep(backoff_delay(
+                            attempt,
+                            settings.PRODUCTS_RETRY_BACKOFF_SECONDS,
+                            settings.PRODUCTS_RETRY_MAX_BACKOFF_SECONDS,
+                        ))
+                        attempt += 1
+                        continue
+                    cls.breaker.record_failure()
+                    upstream_errors.inc(
+                        kind="connection"
+                        if isinstance(e, httpx.RequestError) else "status"
+                    )
+                    raise
+        finally:
+            if probe:
+                cls.breaker.release_probe()
+
+    @classmethod
+    def hedge_delay(cls) -> float | None:
+        if settings.PRODUCTS_HEDGE_DELAY_SECONDS > 0:
+            return settings.PRODUCTS_HEDGE_DELAY_SECONDS
+        # Without a fixed delay, hedge at the observed p95 once enough
+        # samples have been collected.
+        if len(cls.latencies) < settings.PRODUCTS_HEDGE_MIN_SAMPLES:
+            return None
+        return cls.latencies.percentile(0.95)
+
+    @classmethod
+    async def send(cls, client: httpx.AsyncClient, url: str) -> httpx.Response:
+        async def get():
+            started = time.perf_counter()
             try:
-                response = await client.get(
-                    f"https://fakestoreapi.com/products/{product_id}")
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPStatusError as e:
-                if e.response.status_code == 404:
-                    return None
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Error fetching product: {str(e)}"
-                )
-            except Exception as e:
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Connection error: {str(e)}"
-                )
+                response = await client.get(url)
+            except httpx.RequestError:
+                upstream_requests.inc(status="connection_error")
+                raise
+            finally:
+                elapsed = time.perf_counter() - started
+                upstream_request_duration.observe(elapsed)
+            cls.latencies.observe(elapsed)
+            upstream_requests.inc(status=response.status_code)
+            return response
+
+        delay = cls.hedge_delay() if settings.PRODUCTS_HEDGE_ENABLED else None
+        if delay is None:
+            return await get()
+        return await cls.hedger.run(get, delay)
+
+    @classmethod
+    async def fetch_products(cls) -> list:
+        try:
+            response = await cls.request(
+                f"{settings.PRODUCTS_API_URL}/products"
+            )
+            products = response.json()
+        except CircuitOpenError:
+            raise HTTPException(
+                status_code=503,
+                detail="Products service temporarily unavailable",
+            )
+        except httpx.HTTPStatusError as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error fetching products: {str(e)}",
+            )
+        except httpx.RequestError as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Connection error: {str(e)}",
+            )
+
+        for product in products:
+            cls.cache.set(cls.product_key(product["id"]), product)
+        return products
+
+    @classmethod
+    async def fetch_product(cls, product_id: str):
+        try:
+            response = await cls.request(
+                f"{settings.PRODUCTS_API_URL}/products/{product_id}"
+            )
+            return response.json()
+        except CircuitOpenError:
+            raise HTTPException(
+                status_code=503,
+                detail="Products service temporarily unavailable",
+            )
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                return None
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error fetching product: {str(e)}"
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Connection error: {str(e)}"
+            )
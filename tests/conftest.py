@@ -1,7 +1,11 @@
+from contextlib import contextmanager
+
+import pytest
 import pytest_asyncio
 from httpx import AsyncClient
 from httpx._transports.asgi import ASGITransport
 from src.index import app
+from src.infrastructure.instrumentation import track_queries
 
 
 @pytest_asyncio.fixture(scope="session")
@@ -12,3 +16,26 @@ async def async_client():
         base_url="http://testserver"
     ) as client:
         yield client
+
+
+@pytest.fixture
+def query_budget():
+    # Fails the test when the block runs more SQL statements than allowed,
+    # or repeats the same statement (the N+1 shape). Requests must run in
+    # the test's own task, e.g. through ASGITransport, not TestClient.
+    @contextmanager
+    def budget(max_queries: int, max_duplicates: int = 0):
+        with track_queries() as stats:
+            yield stats
+        statements = "\n".join(
+            f"{n}x {sql}" for sql, n in stats.statements.items()
+        )
+        assert stats.count <= max_queries, (
+            f"{stats.count} SQL statements, budget is {max_queries}:\n"
+            f"{statements}"
+        )
+        assert stats.duplicates <= max_duplicates, (
+            f"{stats.duplicates} repeated SQL statements:\n{statements}"
+        )
+
+    return budget
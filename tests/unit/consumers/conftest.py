@@ -1,6 +1,8 @@
 import pytest
+import pytest_asyncio
 from fastapi.testclient import TestClient
 from fastapi import FastAPI
+from src.domains.consumers.cache import consumer_cache
 from src.domains.consumers.routers import router
 
 
@@ -15,3 +17,10 @@ def client():
     dependency = router.dependencies[0].dependency
     app.dependency_overrides[dependency] = mock_get_current_user
     return TestClient(app)
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def clear_consumer_cache():
+    await consumer_cache.clear()
+    yield
+    await consumer_cache.clear()
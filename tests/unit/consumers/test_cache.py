@@ -0,0 +1,192 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import orjson
+import pytest
+
+from src.domains.consumers.cache import ConsumerCache, consumer_cache
+from src.domains.consumers.repositories import (
+    ConsumerRecord,
+    ConsumerRepository,
+    FavoriteRepository,
+)
+from src.domains.consumers.schemas import ConsumerResponse
+from src.domains.consumers.services import ConsumerService
+from src.infrastructure.cache import MemoryBackend
+
+
+def mock_db():
+    db = AsyncMock()
+    db.add = MagicMock()
+    return db
+
+
+@pytest.fixture
+def consumer(mocker):
+    consumer = ConsumerRecord(
+        id=uuid4(), name="A", email="a@x.com", product_ids=[]
+    )
+    mocker.patch.object(
+        ConsumerRepository,
+        'get_consumer_record',
+        AsyncMock(return_value=consumer),
+    )
+    mocker.patch.object(
+        ConsumerService,
+        'retrive_consumer_record',
+        AsyncMock(return_value=ConsumerResponse(
+            id=consumer.id, name="A", email="a@x.com"
+        )),
+    )
+    return consumer
+
+
+@pytest.mark.asyncio
+async def test_payload_is_served_from_cache(consumer):
+    first = await ConsumerService.get_consumer_payload(consumer.id, None)
+    second = await ConsumerService.get_consumer_payload(consumer.id, None)
+
+    assert first == second
+    assert orjson.loads(second)["email"] == "a@x.com"
+    ConsumerRepository.get_consumer_record.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_missing_consumer_is_not_cached(mocker):
+    mocker.patch.object(
+        ConsumerRepository, 'get_consumer_record', AsyncMock(return_value=None)
+    )
+    consumer_id = uuid4()
+
+    assert await ConsumerService.get_consumer_payload(consumer_id, None) is None
+    assert await consumer_cache.get(consumer_id) is None
+
+
+@pytest.mark.asyncio
+async def test_writes_invalidate_the_consumer(consumer, mocker):
+    db = mock_db()
+
+    async def cached():
+        await ConsumerService.get_consumer_payload(consumer.id, None)
+        return await consumer_cache.get(consumer.id)
+
+    assert await cached() is not None
+    db.execute.return_value = MagicMock(all=lambda: [SimpleNamespace(
+        id=consumer.id, name="B", email="a@x.com", product_id=None
+    )])
+    await ConsumerRepository.update_consumer(consumer.id, {"name": "B"}, db)
+    assert await consumer_cache.get(consumer.id) is None
+
+    assert await cached() is not None
+    db.execute.return_value = MagicMock(
+        scalar_one_or_none=lambda: consumer.id
+    )
+    await ConsumerRepository.delete_consumer(consumer.id, db)
+    assert await consumer_cache.get(consumer.id) is None
+
+
+@pytest.mark.asyncio
+async def test_bulk_insert_invalidates_only_when_rows_were_added(consumer):
+    db = mock_db()
+    await ConsumerService.get_consumer_payload(consumer.id, None)
+
+    db.execute.return_value = MagicMock(
+        scalars=MagicMock(return_value=MagicMock(all=lambda: []))
+    )
+    await FavoriteRepository.bulk_create_favorites(consumer.id, ["1"], db)
+    assert await consumer_cache.get(consumer.id) is not None
+
+    db.execute.return_value = MagicMock(
+        scalars=MagicMock(return_value=MagicMock(all=lambda: ["1"]))
+    )
+    await FavoriteRepository.bulk_create_favorites(consumer.id, ["1"], db)
+    assert await consumer_cache.get(consumer.id) is None
+
+
+@pytest.mark.asyncio
+async def test_backend_errors_degrade_to_misses():
+    backend = MemoryBackend(10)
+    backend.get = AsyncMock(side_effect=ConnectionError("down"))
+    cache = ConsumerCache(backend, ttl=60)
+
+    assert await cache.get("1") is None
+    assert cache.stats()["errors"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_disabled_cache_stores_nothing():
+    cache = ConsumerCache(None)
+
+    await cache.set("1", b"{}", await cache.generation("1"))
+
+    assert await cache.get("1") is None
+    assert cache.stats()["backend"] == "none"
+
+
+@pytest.mark.asyncio
+async def test_removal_invalidates_only_when_rows_were_deleted(consumer):
+    db = mock_db()
+    await ConsumerService.get_consumer_payload(consumer.id, None)
+
+    db.execute.return_value = MagicMock(
+        scalars=MagicMock(return_value=MagicMock(all=lambda: []))
+    )
+    await FavoriteRepository.remove_favorites(consumer.id, ["1"], db)
+    assert await consumer_cache.get(consumer.id) is not None
+
+    db.execute.return_value = MagicMock(
+        scalars=MagicMock(return_value=MagicMock(all=lambda: ["1"]))
+    )
+    await FavoriteRepository.remove_favorites(consumer.id, ["1"], db)
+    assert await consumer_cache.get(consumer.id) is None
+
+
+@pytest.mark.asyncio
+async def test_replace_invalidates_only_when_favorites_changed(consumer):
+    db = mock_db()
+    await ConsumerService.get_consumer_payload(consumer.id, None)
+
+    def results(removed, added):
+        return [
+            MagicMock(scalar_one_or_none=lambda: consumer.id),
+            MagicMock(scalars=lambda: MagicMock(all=lambda: removed)),
+            MagicMock(scalars=lambda: MagicMock(all=lambda: added)),
+        ]
+
+    db.execute.side_effect = results([], [])
+    await FavoriteRepository.replace_favorites(consumer.id, ["1"], db)
+    assert await consumer_cache.get(consumer.id) is not None
+
+    db.execute.side_effect = results(["2"], [])
+    await FavoriteRepository.replace_favorites(consumer.id, ["1"], db)
+    assert await consumer_cache.get(consumer.id) is None
+
+
+@pytest.mark.asyncio
+async def test_write_during_load_keeps_stale_payload_out(consumer, mocker):
+    record = ConsumerRepository.get_consumer_record.return_value
+
+    async def read_then_concurrent_write(consumer_id, db):
+        # The row was read; a write commits and invalidates before set().
+        await consumer_cache.invalidate(consumer_id)
+        return record
+
+    mocker.patch.object(
+        ConsumerRepository,
+        'get_consumer_record',
+        AsyncMock(side_effect=read_then_concurrent_write),
+    )
+
+    payload = await ConsumerService.get_consumer_payload(consumer.id, None)
+
+    assert payload is not None
+    assert await consumer_cache.get(consumer.id) is None
+    assert consumer_cache.stats()["stale_writes"] >= 1
+
+    # The next read, with no write in between, caches again.
+    ConsumerRepository.get_consumer_record.side_effect = None
+    ConsumerRepository.get_consumer_record.return_value = record
+    await ConsumerService.get_consumer_payload(consumer.id, None)
+    assert await consumer_cache.get(consumer.id) is not None
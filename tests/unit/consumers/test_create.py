@@ -2,13 +2,20 @@ import pytest
 from fastapi import status
 from uuid import uuid4
 from unittest.mock import AsyncMock
+from sqlalchemy.exc import IntegrityError
 
-from src.domains.consumers.repositories import ConsumerRepository
+from src.domains.consumers.repositories import (
+    ConsumerRecord,
+    ConsumerRepository,
+)
+from src.domains.consumers.schemas import ConsumerCreate
 
 
 @pytest.mark.asyncio
 async def test_create_consumer_success(client, mocker):
-    mock_consumer = {"id": uuid4(), "name": "Test", "email": "test@example.com"}
+    mock_consumer = ConsumerRecord(
+        id=uuid4(), name="Test", email="test@example.com", product_ids=[]
+    )
     mocker.patch.object(ConsumerRepository, 'create_consumer', AsyncMock(
         return_value=mock_consumer
     )
@@ -20,8 +27,36 @@ async def test_create_consumer_success(client, mocker):
     }
     )
     assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()["favorites"] == []
 
 
 def test_create_consumer_invalid_data(client):
     response = client.post("/consumers/", json={"name": "", "email": "invalid"})
     assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_create_consumer_maps_unique_violation():
+    db = AsyncMock()
+    db.execute.side_effect = IntegrityError("INSERT", {}, Exception("dup"))
+
+    with pytest.raises(ValueError, match="already exists"):
+        await ConsumerRepository.create_consumer(
+            ConsumerCreate(name="Test", email="test@example.com"), db
+        )
+
+    db.rollback.assert_awaited_once()
+    db.commit.assert_not_awaited()
+
+
+def test_create_consumer_duplicate_email(client, mocker):
+    mocker.patch.object(ConsumerRepository, 'create_consumer', AsyncMock(
+        side_effect=ValueError("Consumer with this email already exists")
+    ))
+
+    response = client.post("/consumers/", json={
+        "name": "Test",
+        "email": "test@example.com"
+    })
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
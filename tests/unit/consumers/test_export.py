@@ -0,0 +1,125 @@
+import csv
+import io
+import json
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+import pytest
+
+from src.domains.consumers import export
+from src.domains.consumers.repositories import (
+    ConsumerRepository,
+    FavoriteRepository,
+)
+from src.domains.products.services import ProductService
+
+
+@asynccontextmanager
+async def fake_session():
+    yield object()
+
+
+def product(product_id):
+    return {
+        "id": product_id,
+        "title": f"Product {product_id}",
+        "price": 10.0,
+        "image": "http://image",
+    }
+
+
+@pytest.fixture
+def consumers(mocker):
+    rows = [
+        SimpleNamespace(id=uuid4(), name=f"C{i}", email=f"c{i}@x.com")
+        for i in range(3)
+    ]
+
+    async def stream(db, chunk_size):
+        for start in range(0, len(rows), chunk_size):
+            yield rows[start:start + chunk_size]
+
+    mocker.patch.object(ConsumerRepository, 'stream_consumers', stream)
+    mocker.patch.object(
+        FavoriteRepository,
+        'get_product_ids_by_consumer_ids',
+        AsyncMock(side_effect=lambda ids, db: {
+            row.id: ["1", "2"] for row in rows[:1] if row.id in set(ids)
+        }),
+    )
+    mocker.patch.object(
+        ProductService,
+        'get_products_map',
+        AsyncMock(side_effect=lambda ids, db: {
+            pid: product(pid) for pid in ids
+        }),
+    )
+    return rows
+
+
+async def collect(fmt, chunk_size):
+    chunks = [
+        chunk async for chunk in export.export_consumers(
+            fmt, chunk_size, session_factory=fake_session
+        )
+    ]
+    return chunks, b"".join(chunks).decode()
+
+
+@pytest.mark.asyncio
+async def test_export_ndjson_streams_one_chunk_per_page(consumers):
+    chunks, body = await collect("ndjson", 2)
+
+    assert len(chunks) == 2
+    records = [json.loads(line) for line in body.splitlines()]
+    assert [r["id"] for r in records] == [str(c.id) for c in consumers]
+    assert [p["id"] for p in records[0]["favorites"]] == [1, 2]
+    assert records[1]["favorites"] == []
+    assert ProductService.get_products_map.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_export_csv_writes_header_once(consumers):
+    chunks, body = await collect("csv", 2)
+
+    rows = list(csv.reader(io.StringIO(body)))
+    assert rows[0] == export.CSV_COLUMNS
+    assert len(rows) == 4
+    assert rows[1][3] == "1|2"
+    assert rows[1][4] == "Product 1|Product 2"
+    assert rows[2][3] == ""
+
+
+@pytest.mark.asyncio
+async def test_export_csv_empty_table_still_has_header(mocker):
+    async def stream(db, chunk_size):
+        return
+        yield
+
+    mocker.patch.object(ConsumerRepository, 'stream_consumers', stream)
+
+    _, body = await collect("csv", 10)
+
+    assert body.splitlines() == [",".join(export.CSV_COLUMNS)]
+
+
+def test_export_route_streams_attachment(client, mocker):
+    async def fake_export(fmt, chunk_size):
+        yield b"a,b\n"
+
+    mocker.patch(
+        'src.domains.consumers.routers.export_consumers', fake_export
+    )
+    response = client.get("/consumers/export?format=csv&chunk_size=5")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert "consumers.csv" in response.headers["content-disposition"]
+    assert response.text == "a,b\n"
+
+
+def test_export_route_rejects_unknown_format(client):
+    response = client.get("/consumers/export?format=xml")
+    assert response.status_code == 422
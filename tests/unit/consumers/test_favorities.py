@@ -1,21 +1,23 @@
 from http import HTTPStatus
 import pytest
 from uuid import uuid4
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock
 
 from fastapi import status
+from sqlalchemy.dialects import postgresql
 
 from src.domains.consumers.repositories import (
     ConsumerRepository,
-    FavoriteRepository
+    FavoriteRepository,
+    insert_favorites,
 )
-from src.infrastructure.services.productsService import ProductsService
+from src.domains.consumers.schemas import MAX_PRODUCT_IDS
+from src.domains.products.services import ProductService
 
 
 @pytest.mark.asyncio
 async def test_add_favorite_success(client, mocker):
     consumer_id = uuid4()
-    mock_consumer = object()
     mock_product = {
         "id": "1",
         "title": "Prod",
@@ -25,26 +27,20 @@ async def test_add_favorite_success(client, mocker):
 
     mocker.patch.object(
         ConsumerRepository,
-        "get_consumer_by_id",
-        AsyncMock(return_value=mock_consumer),
+        "consumer_exists",
+        AsyncMock(return_value=True),
     )
 
     mocker.patch.object(
-        ProductsService,
-        "get_product_by_id",
-        AsyncMock(return_value=mock_product),
-    )
-
-    mocker.patch.object(
-        FavoriteRepository,
-        "get_favorite_by_product",
-        AsyncMock(return_value=None),
+        ProductService,
+        "get_products_map",
+        AsyncMock(return_value={"1": mock_product}),
     )
 
     mock_create = mocker.patch.object(
         FavoriteRepository,
-        "create_favorite",
-        AsyncMock(),
+        "bulk_create_favorites",
+        AsyncMock(return_value=["1"]),
     )
 
     payload = {"product_ids": ["1"]}
@@ -61,10 +57,10 @@ async def test_add_favorite_success(client, mocker):
         "not_found": [],
     }
 
-    mock_create.assert_called_once_with(
-        consumer_id=consumer_id,
-        product_id="1",
-        db=mock_create.call_args.kwargs["db"]
+    mock_create.assert_awaited_once_with(
+        consumer_id,
+        ["1"],
+        mock_create.call_args.args[2]
     )
 
 
@@ -72,8 +68,8 @@ async def test_add_favorite_success(client, mocker):
 async def test_add_favorite_not_found_consumer(client, mocker):
     mocker.patch.object(
         ConsumerRepository,
-        "get_consumer_by_id",
-        AsyncMock(return_value=None),
+        "consumer_exists",
+        AsyncMock(return_value=False),
     )
 
     response = client.post(
@@ -90,13 +86,18 @@ async def test_add_favorite_not_found_product(client, mocker):
 
     mocker.patch.object(
         ConsumerRepository,
-        "get_consumer_by_id",
-        AsyncMock(return_value=object()),
+        "consumer_exists",
+        AsyncMock(return_value=True),
     )
     mocker.patch.object(
-        ProductsService,
-        "get_product_by_id",
-        AsyncMock(return_value=None),
+        ProductService,
+        "get_products_map",
+        AsyncMock(return_value={}),
+    )
+    mock_create = mocker.patch.object(
+        FavoriteRepository,
+        "bulk_create_favorites",
+        AsyncMock(return_value=[]),
     )
 
     response = client.post(
@@ -108,35 +109,27 @@ async def test_add_favorite_not_found_product(client, mocker):
     data = response.json()
     assert "not_found" in data
     assert "105" in data["not_found"]
+    assert mock_create.call_args.args[1] == []
 
 
 @pytest.mark.asyncio
 async def test_add_favorite_already_exists(client, mocker):
     consumer_id = uuid4()
-    mock_consumer = object()
     mock_product = {"id": "1", "title": "Prod", "price": 10.0, "image": "url"}
     mocker.patch.object(
         ConsumerRepository,
-        "get_consumer_by_id",
-        AsyncMock(return_value=mock_consumer),
-    )
-    mocker.patch.object(
-        ProductsService,
-        "get_product_by_id",
-        AsyncMock(return_value=mock_product),
+        "consumer_exists",
+        AsyncMock(return_value=True),
     )
-
-    get_favorite_mock = AsyncMock()
-    get_favorite_mock.side_effect = [None, None, object(), object()]
     mocker.patch.object(
-        FavoriteRepository,
-        "get_favorite_by_product",
-        get_favorite_mock,
+        ProductService,
+        "get_products_map",
+        AsyncMock(return_value={"1": mock_product, "2": mock_product}),
     )
     mocker.patch.object(
         FavoriteRepository,
-        "create_favorite",
-        AsyncMock(),
+        "bulk_create_favorites",
+        AsyncMock(side_effect=[["1", "2"], []]),
     )
 
     payload = {"product_ids": ["1", "2"]}
@@ -163,38 +156,89 @@ async def test_add_favorite_already_exists(client, mocker):
 
 
 @pytest.mark.asyncio
-async def test_remove_favorite_success(client, mocker):
+async def test_add_favorite_batches_lookup_and_insert(client, mocker):
     consumer_id = uuid4()
-    product_id = "1"
-    mock_consumer = object()
-    mock_fav = object()
-    mock_product = {"id": "1", "title": "Prod", "price": 10.0, "image": "url"}
-
     mocker.patch.object(
         ConsumerRepository,
-        "get_consumer_by_id",
-        AsyncMock(return_value=mock_consumer),
+        "consumer_exists",
+        AsyncMock(return_value=True),
     )
-    mocker.patch.object(
-        ProductsService,
-        "get_product_by_id",
-        AsyncMock(return_value=mock_product),
+    products_map = mocker.patch.object(
+        ProductService,
+        "get_products_map",
+        AsyncMock(return_value={"1": {}, "2": {}, "3": {}}),
     )
-    mocker.patch.object(
+    mock_create = mocker.patch.object(
         FavoriteRepository,
-        "get_favorite_by_product",
-        AsyncMock(return_value=mock_fav),
+        "bulk_create_favorites",
+        AsyncMock(return_value=["1", "3"]),
     )
-    mocker.patch.object(
+
+    response = client.post(
+        f"/consumers/{consumer_id}/favorites",
+        json={"product_ids": ["1", "2", "99", "3", "1"]},
+    )
+
+    assert response.json() == {
+        "message": "Favorites added successfully",
+        "added": ["1", "3"],
+        "already_exists": ["2", "1"],
+        "not_found": ["99"],
+    }
+    products_map.assert_awaited_once()
+    mock_create.assert_awaited_once()
+    assert mock_create.call_args.args[1] == ["1", "2", "3"]
+
+
+def test_add_favorites_rejects_oversized_batch(client, mocker):
+    create = mocker.patch.object(
+        FavoriteRepository, "bulk_create_favorites", AsyncMock()
+    )
+
+    response = client.post(
+        f"/consumers/{uuid4()}/favorites",
+        json={"product_ids": [str(i) for i in range(MAX_PRODUCT_IDS + 1)]},
+    )
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    create.assert_not_awaited()
+
+
+def test_insert_favorites_binds_ids_as_one_array():
+    compiled = insert_favorites(
+        uuid4(), [str(i) for i in range(20000)]
+    ).compile(dialect=postgresql.asyncpg.dialect())
+    sql = " ".join(str(compiled).split())
+
+    assert len(compiled.params) == 4
+    # The derived column list is what makes ids.product_id resolvable.
+    assert (
+        "FROM unnest($4::VARCHAR[]) WITH ORDINALITY"
+        " AS ids(product_id, ordinality)"
+    ) in sql
+    assert "ids.product_id," in sql
+    assert "+ ids.ordinality * $3::INTERVAL" in sql
+
+
+@pytest.mark.asyncio
+async def test_remove_favorite_success(client, mocker):
+    consumer_id = uuid4()
+    remove = mocker.patch.object(
         FavoriteRepository,
-        "delete_favorite",
-        AsyncMock(),
+        "remove_favorites",
+        AsyncMock(return_value=["1"]),
+    )
+    exists = mocker.patch.object(
+        ConsumerRepository, "consumer_exists", AsyncMock()
     )
 
     response = client.patch(
-        f"/consumers/{consumer_id}/favorites/{product_id}",
+        f"/consumers/{consumer_id}/favorites/1",
     )
+
     assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert remove.call_args.args[:2] == (consumer_id, ["1"])
+    exists.assert_not_awaited()
 
 
 @pytest.mark.asyncio
@@ -208,40 +252,33 @@ async def test_remove_favorite_invalid_id(client):
 
 @pytest.mark.asyncio
 async def test_remove_favorite_not_found_consumer(client, mocker):
-    consumer_id = uuid4()
-    product_id = "1"
-
     mocker.patch.object(
-        ConsumerRepository,
-        "get_consumer_by_id",
-        AsyncMock(return_value=None),
+        FavoriteRepository, "remove_favorites", AsyncMock(return_value=[])
+    )
+    mocker.patch.object(
+        ConsumerRepository, "consumer_exists", AsyncMock(return_value=False)
     )
 
     response = client.patch(
-        f"/consumers/{consumer_id}/favorites/{product_id}",
+        f"/consumers/{uuid4()}/favorites/1",
     )
 
     assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.json()["detail"] == "Consumer not found"
 
 
 @pytest.mark.asyncio
 async def test_remove_favorite_not_found_product(client, mocker):
-    consumer_id = uuid4()
-    product_id = "1"
-
+    # An unknown product cannot be a favorite: no upstream call is needed.
     mocker.patch.object(
-        ConsumerRepository,
-        "get_consumer_by_id",
-        AsyncMock(return_value=object()),
+        FavoriteRepository, "remove_favorites", AsyncMock(return_value=[])
     )
     mocker.patch.object(
-        ProductsService,
-        "get_product_by_id",
-        AsyncMock(return_value=None),
+        ConsumerRepository, "consumer_exists", AsyncMock(return_value=True)
     )
 
     response = client.patch(
-        f"/consumers/{consumer_id}/favorites/{product_id}",
+        f"/consumers/{uuid4()}/favorites/999",
     )
 
     assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -249,27 +286,193 @@ async def test_remove_favorite_not_found_product(client, mocker):
 
 @pytest.mark.asyncio
 async def test_remove_favorite_not_found_favorite(client, mocker):
+    mocker.patch.object(
+        FavoriteRepository, "remove_favorites", AsyncMock(return_value=[])
+    )
+    mocker.patch.object(
+        ConsumerRepository, "consumer_exists", AsyncMock(return_value=True)
+    )
+
+    response = client.patch(
+        f"/consumers/{uuid4()}/favorites/1",
+    )
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.json()["detail"] == "Favorite not found"
+
+
+@pytest.mark.asyncio
+async def test_remove_favorites_bulk(client, mocker):
     consumer_id = uuid4()
-    product_id = "1"
+    remove = mocker.patch.object(
+        FavoriteRepository,
+        "remove_favorites",
+        AsyncMock(return_value=["3", "1"]),
+    )
+
+    response = client.delete(
+        f"/consumers/{consumer_id}/favorites"
+        "?product_ids=1&product_ids=2&product_ids=3&product_ids=1",
+    )
 
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "message": "Favorites removed successfully",
+        "removed": ["1", "3"],
+        "not_found": ["2"],
+    }
+    remove.assert_awaited_once()
+    assert remove.call_args.args[1] == ["1", "2", "3"]
+
+
+@pytest.mark.asyncio
+async def test_remove_favorites_bulk_not_found_consumer(client, mocker):
     mocker.patch.object(
-        ConsumerRepository,
-        "get_consumer_by_id",
-        AsyncMock(return_value=object()),
+        FavoriteRepository, "remove_favorites", AsyncMock(return_value=[])
     )
     mocker.patch.object(
-        ProductsService,
-        "get_product_by_id",
-        AsyncMock(return_value={}),
+        ConsumerRepository, "consumer_exists", AsyncMock(return_value=False)
+    )
+
+    response = client.delete(f"/consumers/{uuid4()}/favorites?product_ids=1")
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_remove_favorites_bulk_requires_ids(client):
+    response = client.delete(f"/consumers/{uuid4()}/favorites")
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_update_favorites_replace_returns_diff(client, mocker):
+    consumer_id = uuid4()
+    mocker.patch.object(
+        ProductService,
+        "get_products_map",
+        AsyncMock(return_value={"1": {}, "2": {}, "3": {}}),
+    )
+    replace = mocker.patch.object(
+        FavoriteRepository,
+        "replace_favorites",
+        AsyncMock(return_value=(["3"], ["7", "8"])),
+    )
+    exists = mocker.patch.object(
+        ConsumerRepository, "consumer_exists", AsyncMock()
+    )
+
+    response = client.patch(
+        f"/consumers/update/favorites/{consumer_id}?mode=replace",
+        json={"product_ids": ["1", "2", "3", "99", "1"]},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "message": "Favorites replaced successfully",
+        "added": ["3"],
+        "removed": ["7", "8"],
+        "unchanged": ["1", "2"],
+        "not_found": ["99"],
+    }
+    replace.assert_awaited_once()
+    assert replace.call_args.args[:2] == (consumer_id, ["1", "2", "3"])
+    exists.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_update_favorites_replace_not_found_consumer(client, mocker):
+    mocker.patch.object(
+        ProductService,
+        "get_products_map",
+        AsyncMock(return_value={"1": {}}),
     )
     mocker.patch.object(
         FavoriteRepository,
-        "get_favorite_by_product",
+        "replace_favorites",
         AsyncMock(return_value=None),
     )
 
     response = client.patch(
-        f"/consumers/{consumer_id}/favorites/{product_id}",
+        f"/consumers/update/favorites/{uuid4()}?mode=replace",
+        json={"product_ids": ["1"]},
     )
 
     assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_replace_favorites_runs_in_one_transaction():
+    consumer_id = uuid4()
+    db = AsyncMock()
+    db.execute.side_effect = [
+        MagicMock(scalar_one_or_none=lambda: consumer_id),
+        MagicMock(scalars=lambda: MagicMock(all=lambda: ["7"])),
+        MagicMock(scalars=lambda: MagicMock(all=lambda: ["3"])),
+    ]
+
+    result = await FavoriteRepository.replace_favorites(
+        consumer_id, ["1", "3"], db
+    )
+
+    assert result == (["3"], ["7"])
+    assert db.execute.await_count == 3
+    db.commit.assert_awaited_once()
+    lock, delete, insert = [
+        " ".join(str(call.args[0].compile(
+            dialect=postgresql.asyncpg.dialect(),
+            compile_kwargs={"render_postcompile": True},
+        )).split())
+        for call in db.execute.await_args_list
+    ]
+    assert lock.endswith("FOR UPDATE")
+    assert (
+        'DELETE FROM "Favorites" WHERE "Favorites".consumer_id = $1::UUID'
+        ' AND ("Favorites".product_id NOT IN ($2::VARCHAR, $3::VARCHAR))'
+        ' RETURNING "Favorites".product_id'
+    ) == delete
+    assert "WITH ORDINALITY AS ids(product_id, ordinality)" in insert
+    assert insert.endswith(
+        "ON CONFLICT ON CONSTRAINT _consumer_product_uc DO NOTHING"
+        ' RETURNING "Favorites".product_id'
+    )
+
+
+@pytest.mark.asyncio
+async def test_replace_favorites_missing_consumer_changes_nothing():
+    db = AsyncMock()
+    db.execute.return_value = MagicMock(scalar_one_or_none=lambda: None)
+
+    assert await FavoriteRepository.replace_favorites(
+        uuid4(), ["1"], db
+    ) is None
+    db.execute.assert_awaited_once()
+    db.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_update_favorites_merge_is_the_default(client, mocker):
+    mocker.patch.object(
+        ConsumerRepository, "consumer_exists", AsyncMock(return_value=True)
+    )
+    mocker.patch.object(
+        ProductService,
+        "get_products_map",
+        AsyncMock(return_value={"1": {}}),
+    )
+    mocker.patch.object(
+        FavoriteRepository,
+        "bulk_create_favorites",
+        AsyncMock(return_value=["1"]),
+    )
+    replace = mocker.patch.object(
+        FavoriteRepository, "replace_favorites", AsyncMock()
+    )
+
+    response = client.patch(
+        f"/consumers/update/favorites/{uuid4()}",
+        json={"product_ids": ["1"]},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["added"] == ["1"]
+    replace.assert_not_awaited()
@@ -0,0 +1,173 @@
+import json
+import threading
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from src.config.settings import settings
+from src.domains.consumers import importer
+from src.domains.consumers.repositories import ConsumerRepository
+from src.domains.products.services import ProductService
+
+
+@pytest.fixture
+def staging(mocker):
+    copied = []
+
+    async def copy(records, db):
+        copied.extend([record async for record in records])
+        return len(copied)
+
+    mocker.patch.object(
+        ConsumerRepository, 'create_import_staging', AsyncMock()
+    )
+    mocker.patch.object(ConsumerRepository, 'copy_import_rows', copy)
+    mocker.patch.object(
+        ConsumerRepository,
+        'get_unknown_import_product_ids',
+        AsyncMock(side_effect=lambda db, limit: sorted(
+            {pid for record in copied for pid in record[3]} - {"1"}
+        )[:limit]),
+    )
+    mocker.patch.object(
+        ConsumerRepository,
+        'merge_import',
+        AsyncMock(return_value={"imported": 2, "favorites": 1}),
+    )
+    mocker.patch.object(
+        ConsumerRepository,
+        'get_import_rejections',
+        AsyncMock(return_value=[{
+            "line": 3,
+            "email": "a@x.com",
+            "reason": "Duplicate email in upload",
+        }]),
+    )
+    mocker.patch.object(ProductService, 'get_products_map', AsyncMock())
+    return copied
+
+
+@pytest.mark.asyncio
+async def test_import_ndjson_reports_rejections(staging):
+    lines = [
+        json.dumps({"name": "A", "email": "a@x.com",
+                    "favorite_product_ids": ["1", "1", "9"]}),
+        "",
+        "{not json",
+        json.dumps({"name": "", "email": "b@x.com"}),
+        json.dumps({"name": "C", "email": "c@x.com",
+                    "favorites": [{"id": 1, "title": "P"}]}),
+        json.dumps({"name": "A2", "email": "a@x.com"}),
+    ]
+    db = AsyncMock()
+
+    report = await importer.import_consumers("ndjson", lines, db)
+
+    assert staging == [
+        (1, "A", "a@x.com", ["1", "9"]),
+        (5, "C", "c@x.com", ["1"]),
+        (6, "A2", "a@x.com", []),
+    ]
+    ConsumerRepository.merge_import.assert_awaited_once_with(db)
+    # Ids are checked against the local catalog only, never upstream.
+    ProductService.get_products_map.assert_not_awaited()
+    db.commit.assert_awaited_once()
+    assert report["received"] == 5
+    assert report["imported"] == 2
+    assert report["favorites"] == 1
+    assert report["rejected"] == 3
+    assert [r["line"] for r in report["rejections"]] == [3, 3, 4]
+    assert report["rejections"][0]["reason"] == "Invalid JSON"
+    assert report["rejections"][2]["reason"].startswith("name:")
+    assert report["unknown_product_ids"] == ["9"]
+
+
+@pytest.mark.asyncio
+async def test_import_csv_splits_favorites(staging):
+    lines = [
+        "name,email,favorite_product_ids\r\n",
+        "A,a@x.com,1|2\r\n",
+        "B,b@x.com,\r\n",
+    ]
+
+    await importer.import_consumers("csv", lines, AsyncMock())
+
+    assert staging == [
+        (2, "A", "a@x.com", ["1", "2"]),
+        (3, "B", "b@x.com", []),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_import_caps_listed_rejections(staging, mocker):
+    mocker.patch.object(settings, 'CONSUMER_IMPORT_MAX_REJECTIONS', 1)
+    ConsumerRepository.merge_import.return_value = {
+        "imported": 0,
+        "favorites": 0,
+    }
+
+    report = await importer.import_consumers(
+        "ndjson", ["x", "y", "z"], AsyncMock()
+    )
+
+    assert report["rejected"] == 3
+    assert len(report["rejections"]) == 1
+    ConsumerRepository.get_import_rejections.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_import_reads_upload_off_the_event_loop(staging):
+    readers = set()
+
+    def lines():
+        for i in range(3):
+            readers.add(threading.get_ident())
+            yield json.dumps({"name": "A", "email": f"{i}@x.com"})
+
+    await importer.import_consumers("ndjson", lines(), AsyncMock())
+
+    assert len(staging) == 3
+    assert threading.get_ident() not in readers
+
+
+@pytest.mark.asyncio
+async def test_import_rejections_tell_existing_from_repeated_emails():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            "CREATE TABLE consumer_import"
+            " (line int, email text, imported bool)"
+        ))
+        await conn.execute(text(
+            "INSERT INTO consumer_import VALUES"
+            " (1, 'new@x.com', 1), (2, 'new@x.com', 0),"
+            " (3, 'old@x.com', 0), (4, 'old@x.com', 0)"
+        ))
+    async with AsyncSession(engine) as db:
+        rejections = await ConsumerRepository.get_import_rejections(db, 10)
+    await engine.dispose()
+
+    assert [r["reason"] for r in rejections] == [
+        "Duplicate email in upload",
+        "Consumer with this email already exists",
+        "Consumer with this email already exists",
+    ]
+
+
+def test_import_route_reads_upload(client, mocker):
+    report = {"received": 1, "imported": 1}
+    mock_import = mocker.patch(
+        'src.domains.consumers.routers.import_consumers',
+        AsyncMock(return_value=report),
+    )
+
+    response = client.post(
+        "/consumers/import?format=csv",
+        files={"file": ("c.csv", b"name,email\nA,a@x.com\n", "text/csv")},
+    )
+
+    assert response.status_code == 200
+    assert response.json() == report
+    assert mock_import.await_args.args[0] == "csv"
@@ -0,0 +1,126 @@
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from httpx import AsyncClient
+from httpx._transports.asgi import ASGITransport
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.domains.consumers.models import Consumer, Favorite
+from src.domains.consumers.routers import router
+from src.domains.products.models import Product
+from src.infrastructure.database import Base, get_db
+from src.infrastructure.instrumentation import (
+    QueryStatsMiddleware,
+    instrument_engine,
+    request_queries,
+)
+
+
+async def seed(session_factory, consumers: int):
+    async with session_factory() as db:
+        db.add_all([
+            Product(
+                external_id=str(i),
+                title=f"Product {i}",
+                price=10.0,
+                image="http://image",
+                content_hash="x",
+            )
+            for i in range(1, 4)
+        ])
+        for i in range(consumers):
+            db.add(Consumer(
+                name=f"C{i}",
+                email=f"c{i}@x.com",
+                favorites=[
+                    Favorite(product_id=str(p)) for p in range(1, 4)
+                ],
+            ))
+        await db.commit()
+
+
+@pytest_asyncio.fixture
+async def sqlite_client():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    instrument_engine(engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = sessionmaker(
+        bind=engine, class_=AsyncSession, expire_on_commit=False
+    )
+
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(QueryStatsMiddleware, debug_header=True)
+
+    async def get_sqlite_db():
+        async with session_factory() as session:
+            yield session
+
+    async def no_auth():
+        return {"user": "test-user"}
+
+    app.dependency_overrides[get_db] = get_sqlite_db
+    app.dependency_overrides[router.dependencies[0].dependency] = no_auth
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://testserver",
+    ) as client:
+        client.session_factory = session_factory
+        yield client
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("consumers", [2, 20])
+async def test_list_consumers_query_budget(
+    sqlite_client, query_budget, consumers
+):
+    await seed(sqlite_client.session_factory, consumers)
+
+    # count, the page joined to its favorites, products: whatever the size.
+    with query_budget(3):
+        response = await sqlite_client.get("/consumers/?page_size=50")
+
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert len(data) == consumers
+    assert all(
+        [p["id"] for p in c["favorites"]] == [1, 2, 3] for c in data
+    )
+
+
+@pytest.mark.asyncio
+async def test_retrieve_consumer_query_budget(sqlite_client, query_budget):
+    await seed(sqlite_client.session_factory, 1)
+    async with sqlite_client.session_factory() as db:
+        consumer = (await db.execute(
+            Consumer.__table__.select()
+        )).first()
+
+    with query_budget(2):
+        response = await sqlite_client.get(
+            f"/consumers/{consumer.id}"
+        )
+
+    assert response.status_code == 200
+    assert len(response.json()["favorites"]) == 3
+
+
+@pytest.mark.asyncio
+async def test_debug_header_reports_statements(sqlite_client):
+    await seed(sqlite_client.session_factory, 2)
+
+    response = await sqlite_client.get("/consumers/?include_total=false")
+
+    assert int(response.headers["x-db-query-count"]) == 2
+    assert response.headers["x-db-duplicate-queries"] == "0"
+    assert float(response.headers["x-db-query-time-ms"]) >= 0
+
+
+def test_query_budget_fails_on_repeated_statement(query_budget):
+    with pytest.raises(AssertionError, match="repeated"):
+        with query_budget(5):
+            request_queries.get().record("SELECT 1", 0.0)
+            request_queries.get().record("SELECT 1", 0.0)
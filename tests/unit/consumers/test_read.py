@@ -4,8 +4,18 @@ from unittest.mock import AsyncMock
 
 import pytest
 
-from src.domains.consumers.repositories import ConsumerRepository
-from src.domains.consumers.services import ConsumerService
+from src.config.settings import settings
+from src.domains.consumers.repositories import (
+    ConsumerRecord,
+    ConsumerRepository,
+)
+from src.domains.consumers.services import (
+    ConsumerService,
+    decode_cursor,
+    encode_cursor,
+)
+from src.domains.products.services import ProductService
+from src.infrastructure.cache import LRUCache
 from src.domains.consumers.schemas import (
     ConsumerResponse, PaginatedConsumerResponse
 )
@@ -41,12 +51,12 @@ async def test_retrieve_consumer_success(client, mocker):
     )
     mocker.patch.object(
         ConsumerRepository,
-        'get_consumer_by_id',
+        'get_consumer_record',
         AsyncMock(return_value=True)
     )
     mocker.patch.object(
         ConsumerService,
-        'retrive_consumer',
+        'retrive_consumer_record',
         AsyncMock(return_value=mock_consumer)
     )
     response = client.get(f"/consumers/{mock_consumer.id}")
@@ -58,8 +68,122 @@ async def test_retrieve_consumer_success(client, mocker):
 async def test_retrieve_consumer_not_found(client, mocker):
     mocker.patch.object(
         ConsumerRepository,
-        'get_consumer_by_id',
+        'get_consumer_record',
         AsyncMock(return_value=None)
     )
     response = client.get(f"/consumers/{uuid4()}")
     assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def make_consumers(count):
+    return [
+        ConsumerRecord(
+            id=uuid4(), name=f"C{i}", email=f"c{i}@example.com", product_ids=[]
+        )
+        for i in range(count)
+    ]
+
+
+def test_cursor_round_trip():
+    consumer_id = uuid4()
+    assert decode_cursor(encode_cursor(consumer_id)) == consumer_id
+
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+@pytest.mark.asyncio
+async def test_list_with_favorites_keyset_page(mocker):
+    consumers = make_consumers(3)
+    count = mocker.patch.object(
+        ConsumerRepository, 'count_consumers', AsyncMock(return_value=50)
+    )
+    get_page = mocker.patch.object(
+        ConsumerRepository,
+        'get_consumer_records',
+        AsyncMock(return_value=consumers),
+    )
+    mocker.patch.object(
+        ProductService, 'get_products_map', AsyncMock(return_value={})
+    )
+    after_id = uuid4()
+    db = AsyncMock()
+
+    page = await ConsumerService.list_with_favorites(
+        db, 1, 2, cursor=encode_cursor(after_id), include_total=False
+    )
+
+    count.assert_not_awaited()
+    get_page.assert_awaited_once_with(db, skip=0, limit=3, after_id=after_id)
+    assert len(page.data) == 2
+    assert page.total is None
+    assert page.total_pages is None
+    assert decode_cursor(page.next_cursor) == consumers[1].id
+
+
+@pytest.mark.asyncio
+async def test_list_with_favorites_last_page_has_no_cursor(mocker):
+    mocker.patch.object(
+        ConsumerRepository, 'count_consumers', AsyncMock(return_value=2)
+    )
+    mocker.patch.object(
+        ConsumerRepository,
+        'get_consumer_records',
+        AsyncMock(return_value=make_consumers(2)),
+    )
+    mocker.patch.object(
+        ProductService, 'get_products_map', AsyncMock(return_value={})
+    )
+
+    page = await ConsumerService.list_with_favorites(AsyncMock(), 1, 2)
+
+    assert page.next_cursor is None
+    assert page.total == 2
+    assert page.total_pages == 1
+
+
+def test_list_consumers_invalid_cursor(client):
+    response = client.get("/consumers/?cursor=%21%21")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_count_consumers_estimate_strategy(mocker):
+    mocker.patch.object(settings, 'CONSUMER_COUNT_STRATEGY', 'estimate')
+    mocker.patch.object(
+        ConsumerRepository, 'estimate_consumers', AsyncMock(return_value=9800)
+    )
+    exact = mocker.patch.object(
+        ConsumerRepository, 'count_consumers', AsyncMock(return_value=10000)
+    )
+
+    assert await ConsumerService.count_consumers(AsyncMock()) == (9800, False)
+    exact.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_count_consumers_estimate_falls_back_before_analyze(mocker):
+    mocker.patch.object(settings, 'CONSUMER_COUNT_STRATEGY', 'estimate')
+    mocker.patch.object(
+        ConsumerRepository, 'estimate_consumers', AsyncMock(return_value=-1)
+    )
+    mocker.patch.object(
+        ConsumerRepository, 'count_consumers', AsyncMock(return_value=3)
+    )
+
+    assert await ConsumerService.count_consumers(AsyncMock()) == (3, True)
+
+
+@pytest.mark.asyncio
+async def test_count_consumers_cached_strategy(mocker):
+    mocker.patch.object(settings, 'CONSUMER_COUNT_STRATEGY', 'cached')
+    mocker.patch.object(
+        ConsumerService, 'count_cache', LRUCache(max_size=1, ttl=60)
+    )
+    exact = mocker.patch.object(
+        ConsumerRepository, 'count_consumers', AsyncMock(return_value=42)
+    )
+
+    assert await ConsumerService.count_consumers(AsyncMock()) == (42, True)
+    assert await ConsumerService.count_consumers(AsyncMock()) == (42, False)
+    exact.assert_awaited_once()
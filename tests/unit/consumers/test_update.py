@@ -1,7 +1,9 @@
+from types import SimpleNamespace
 import pytest
 from fastapi import status
 from uuid import uuid4
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy.exc import IntegrityError
 
 from src.domains.consumers.services import ConsumerService
 from src.domains.consumers.repositories import ConsumerRepository
@@ -23,7 +25,7 @@ async def test_update_consumer_success(client, mocker):
     )
     mocker.patch.object(
         ConsumerService,
-        'retrive_consumer',
+        'retrive_consumer_record',
         AsyncMock(return_value=mock_updated)
     )
     payload = {"name": "Updated", "email": "updated@example.com"}
@@ -42,3 +44,52 @@ async def test_update_consumer_not_found(client, mocker):
     payload = {"name": "NoOne", "email": "noone@example.com"}
     response = client.put(f"/consumers/{uuid4()}", json=payload)
     assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_update_consumer_is_a_single_statement():
+    consumer_id = uuid4()
+    db = AsyncMock()
+    db.execute.return_value = MagicMock(all=lambda: [
+        SimpleNamespace(
+            id=consumer_id, name="New", email="a@x.com", product_id=p
+        )
+        for p in ("1", "2")
+    ])
+
+    record = await ConsumerRepository.update_consumer(
+        consumer_id, {"name": "New", "email": None}, db
+    )
+
+    db.execute.assert_awaited_once()
+    assert record.name == "New"
+    assert record.product_ids == ["1", "2"]
+
+
+@pytest.mark.asyncio
+async def test_update_consumer_duplicate_email():
+    db = AsyncMock()
+    db.execute.side_effect = IntegrityError("UPDATE", {}, Exception("dup"))
+
+    with pytest.raises(ValueError, match="already exists"):
+        await ConsumerRepository.update_consumer(
+            uuid4(), {"email": "taken@x.com"}, db
+        )
+    db.rollback.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_delete_consumer_missing_returns_none():
+    db = AsyncMock()
+    db.execute.return_value = MagicMock(scalar_one_or_none=lambda: None)
+
+    assert await ConsumerRepository.delete_consumer(uuid4(), db) is None
+    db.execute.assert_awaited_once()
+
+
+def test_delete_consumer_not_found(client, mocker):
+    mocker.patch.object(
+        ConsumerRepository, 'delete_consumer', AsyncMock(return_value=None)
+    )
+    response = client.delete(f"/consumers/{uuid4()}")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
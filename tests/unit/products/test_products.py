@@ -1,11 +1,16 @@
 import pytest
 from fastapi import FastAPI, HTTPException, status
 from fastapi.testclient import TestClient
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
 
+from src.domains.products.models import Product, ProductFavoriteCount
+from src.domains.products.repositories import ProductRepository
 from src.domains.products.routers import router
 from src.domains.products.schemas import ProductDetails
 from src.domains.products.services import ProductService
+from src.infrastructure.database import Base
 from src.infrastructure.services.productsService import ProductsService
 
 
@@ -23,8 +28,15 @@ def client():
     return TestClient(app)
 
 
+@pytest.fixture
+def empty_catalog(mocker):
+    mocker.patch.object(
+        ProductRepository, 'count_products', AsyncMock(return_value=0)
+    )
+
+
 @pytest.mark.asyncio
-async def test_get_available_products_success(mocker):
+async def test_get_available_products_success(mocker, empty_catalog):
     mock_products = [
         {
             "id": i,
@@ -39,7 +51,9 @@ async def test_get_available_products_success(mocker):
         ProductsService, 'get_products', AsyncMock(return_value=mock_products)
     )
 
-    result = await ProductService.get_available_products(page=2, page_size=5)
+    result = await ProductService.get_available_products(
+        MagicMock(), page=2, page_size=5
+    )
 
     assert result["total"] == 20
     assert result["page"] == 2
@@ -51,7 +65,7 @@ async def test_get_available_products_success(mocker):
 
 
 @pytest.mark.asyncio
-async def test_pagination_edge_cases(mocker):
+async def test_pagination_edge_cases(mocker, empty_catalog):
     mock_products = [
         {"id": 1, "title": "Product 1", "price": 10, "image": "image1.jpg"}
     ]
@@ -59,16 +73,20 @@ async def test_pagination_edge_cases(mocker):
         ProductsService, 'get_products', AsyncMock(return_value=mock_products)
     )
 
-    result = await ProductService.get_available_products(page=2, page_size=10)
+    result = await ProductService.get_available_products(
+        MagicMock(), page=2, page_size=10
+    )
     assert result["data"] == []
     assert result["total_pages"] == 1
 
-    result = await ProductService.get_available_products(page=1, page_size=100)
+    result = await ProductService.get_available_products(
+        MagicMock(), page=1, page_size=100
+    )
     assert len(result["data"]) == 1
 
 
 @pytest.mark.asyncio
-async def test_service_error_handling(mocker):
+async def test_service_error_handling(mocker, empty_catalog):
     mocker.patch.object(
         ProductsService,
         'get_products',
@@ -76,11 +94,64 @@ async def test_service_error_handling(mocker):
     )
 
     with pytest.raises(HTTPException) as exc:
-        await ProductService.get_available_products(1, 10)
+        await ProductService.get_available_products(MagicMock(), 1, 10)
 
     assert exc.value.status_code == 500
 
 
+@pytest.mark.asyncio
+async def test_get_available_products_from_local_catalog(mocker):
+    local = Product(
+        external_id="3",
+        title="Local",
+        price=9.9,
+        image="local.jpg",
+        rating_rate=4.1,
+        rating_count=12,
+    )
+    mocker.patch.object(
+        ProductRepository, 'count_products', AsyncMock(return_value=21)
+    )
+    get_page = mocker.patch.object(
+        ProductRepository,
+        'get_products_page',
+        AsyncMock(return_value=[local]),
+    )
+    upstream = mocker.patch.object(ProductsService, 'get_products', AsyncMock())
+    db = MagicMock()
+
+    result = await ProductService.get_available_products(db, 3, 10)
+
+    get_page.assert_awaited_once_with(db, skip=20, limit=10)
+    upstream.assert_not_awaited()
+    assert result["total"] == 21
+    assert result["total_pages"] == 3
+    assert result["data"][0].id == 3
+    assert result["data"][0].rating.count == 12
+
+
+@pytest.mark.asyncio
+async def test_get_products_map_falls_back_to_upstream(mocker):
+    local = Product(external_id="1", title="Local", price=1.0, image="a.jpg")
+    mocker.patch.object(
+        ProductRepository,
+        'get_products_by_external_ids',
+        AsyncMock(return_value=[local]),
+    )
+    upstream = mocker.patch.object(
+        ProductsService,
+        'get_products_by_ids',
+        AsyncMock(return_value={"2": {"id": 2, "title": "Remote"}}),
+    )
+
+    result = await ProductService.get_products_map([1, "2", 3], MagicMock())
+
+    assert set(result) == {"1", "2"}
+    assert result["1"]["title"] == "Local"
+    assert result["2"]["title"] == "Remote"
+    upstream.assert_awaited_once_with({"2", "3"})
+
+
 def test_route_validation(client):
     response = client.get("/products?page=0&page_size=5")
     assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
@@ -116,3 +187,79 @@ def test_unauthorized_access():
 
     response = client.get("/products")
     assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.asyncio
+async def test_get_popular_products_hydrates_ranking(mocker):
+    mocker.patch.object(
+        ProductRepository, 'count_popular_products', AsyncMock(return_value=2)
+    )
+    ranking = mocker.patch.object(
+        ProductRepository,
+        'get_popular_products',
+        AsyncMock(return_value=[
+            (Product(external_id="7", title="Seven", price=7.0,
+                     image="7.jpg"), 40),
+            (Product(external_id="2", title="Two", price=2.0), 12),
+        ]),
+    )
+    db = MagicMock()
+
+    result = await ProductService.get_popular_products(db, 1, 3)
+
+    ranking.assert_awaited_once_with(db, skip=0, limit=3)
+    assert [p.id for p in result["data"]] == [7, 2]
+    assert [p.favorites_count for p in result["data"]] == [40, 12]
+    assert result["data"][1].image is None
+    assert result["total"] == 2
+    assert result["total_pages"] == 1
+
+
+@pytest.mark.asyncio
+async def test_popular_products_rank_only_catalog_products():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = sessionmaker(
+        bind=engine, class_=AsyncSession, expire_on_commit=False
+    )
+    async with session_factory() as db:
+        db.add_all([
+            Product(external_id="1", title="One", price=1.0,
+                    content_hash="x"),
+            Product(external_id="2", title="Two", price=2.0,
+                    content_hash="x"),
+            ProductFavoriteCount(product_id="1", favorites_count=3),
+            ProductFavoriteCount(product_id="2", favorites_count=1),
+            # Favorited but not synced into the catalog yet.
+            ProductFavoriteCount(product_id="99", favorites_count=5),
+        ])
+        await db.commit()
+
+        total = await ProductRepository.count_popular_products(db)
+        page = await ProductRepository.get_popular_products(db, 0, 1)
+        rest = await ProductRepository.get_popular_products(db, 1, 10)
+    await engine.dispose()
+
+    assert total == 2
+    assert [(p.external_id, count) for p, count in page] == [("1", 3)]
+    assert [(p.external_id, count) for p, count in rest] == [("2", 1)]
+
+
+def test_popular_route_success(client, mocker):
+    mock_data = {
+        "data": [],
+        "total": 0,
+        "page": 1,
+        "page_size": 10,
+        "total_pages": 1,
+    }
+    mocker.patch.object(
+        ProductService,
+        'get_popular_products',
+        AsyncMock(return_value=mock_data),
+    )
+
+    response = client.get("/products/popular?page=1&page_size=10")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == mock_data
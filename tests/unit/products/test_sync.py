@@ -0,0 +1,66 @@
+import pytest
+from unittest.mock import AsyncMock
+
+from src.domains.products import sync
+from src.domains.products.repositories import ProductRepository
+from src.infrastructure.services.productsService import ProductsService
+
+
+def make_product(product_id, price=10.0):
+    return {
+        "id": product_id,
+        "title": f"Product {product_id}",
+        "price": price,
+        "description": "desc",
+        "category": "cat",
+        "image": f"image_{product_id}.jpg",
+        "rating": {"rate": 4.5, "count": 10},
+    }
+
+
+def test_content_hash_ignores_key_order():
+    product = make_product(1)
+    reordered = dict(reversed(list(product.items())))
+
+    assert sync.content_hash(product) == sync.content_hash(reordered)
+    assert sync.content_hash(product) != sync.content_hash(
+        make_product(1, price=11.0)
+    )
+
+
+@pytest.mark.asyncio
+async def test_sync_products_writes_only_changed_rows(mocker):
+    unchanged = make_product(1)
+    changed = make_product(2, price=20.0)
+    new = make_product(3)
+    mocker.patch.object(
+        ProductsService,
+        "fetch_products",
+        AsyncMock(return_value=[unchanged, changed, new]),
+    )
+    mocker.patch.object(
+        ProductRepository,
+        "get_content_hashes",
+        AsyncMock(return_value={
+            "1": sync.content_hash(unchanged),
+            "2": sync.content_hash(make_product(2)),
+        }),
+    )
+    upsert = mocker.patch.object(
+        ProductRepository, "upsert_products", AsyncMock()
+    )
+    clear_flags = mocker.patch.object(
+        ProductRepository, "clear_updated_flags", AsyncMock()
+    )
+    db = AsyncMock()
+
+    stats = await sync.sync_products(db)
+
+    assert stats == {"fetched": 3, "changed": 2, "unchanged": 1}
+    rows = upsert.await_args.args[0]
+    assert [row["external_id"] for row in rows] == ["2", "3"]
+    assert all(row["updated"] for row in rows)
+    assert rows[0]["price"] == 20.0
+    assert rows[0]["rating_count"] == 10
+    clear_flags.assert_awaited_once_with(["2", "3"], db)
+    db.commit.assert_awaited_once()
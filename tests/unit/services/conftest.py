@@ -0,0 +1,21 @@
+import pytest
+
+from src.config.settings import settings
+from src.infrastructure.services.productsService import ProductsService
+
+
+@pytest.fixture(autouse=True)
+def clear_products_cache():
+    ProductsService.cache.clear()
+    yield
+    ProductsService.cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_products_resilience(mocker):
+    mocker.patch.object(settings, 'PRODUCTS_RETRY_BACKOFF_SECONDS', 0)
+    ProductsService.breaker.reset()
+    ProductsService.retry_budget.reset()
+    yield
+    ProductsService.breaker.reset()
+    ProductsService.retry_budget.reset()
@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock
+
+from src.infrastructure.cache import LRUCache, SWRCache
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_lru_cache_expires_entries(mocker):
+    clock = mocker.patch("src.infrastructure.cache.time.monotonic")
+    clock.return_value = 100.0
+    cache = LRUCache(max_size=10, ttl=5)
+    cache.set("a", 1)
+
+    clock.return_value = 104.0
+    assert cache.get("a") == 1
+
+    clock.return_value = 105.0
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_swr_cache_loads_once_while_fresh():
+    cache = SWRCache(max_size=10, ttl=60)
+    loader = AsyncMock(return_value=[1, 2, 3])
+
+    assert await cache.get_or_load("k", loader) == [1, 2, 3]
+    assert await cache.get_or_load("k", loader) == [1, 2, 3]
+
+    loader.assert_awaited_once()
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+@pytest.mark.asyncio
+async def test_swr_cache_does_not_store_none():
+    cache = SWRCache(max_size=10, ttl=60)
+    loader = AsyncMock(return_value=None)
+
+    assert await cache.get_or_load("k", loader) is None
+    assert await cache.get_or_load("k", loader) is None
+    assert loader.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_swr_cache_serves_stale_and_refreshes_once(mocker):
+    clock = mocker.patch("src.infrastructure.cache.time.monotonic")
+    clock.return_value = 100.0
+    cache = SWRCache(max_size=10, ttl=10, stale_ttl=50)
+    await cache.get_or_load("k", AsyncMock(return_value="old"))
+
+    clock.return_value = 120.0
+    refresh = AsyncMock(return_value="new")
+    assert await cache.get_or_load("k", refresh) == "old"
+    assert await cache.get_or_load("k", refresh) == "old"
+    await asyncio.sleep(0)
+
+    refresh.assert_awaited_once()
+    assert await cache.get_or_load("k", refresh) == "new"
+    assert cache.stale_hits == 2
+    assert cache.refreshes == 1
+
+
+@pytest.mark.asyncio
+async def test_swr_cache_reloads_after_stale_window(mocker):
+    clock = mocker.patch("src.infrastructure.cache.time.monotonic")
+    clock.return_value = 100.0
+    cache = SWRCache(max_size=10, ttl=10, stale_ttl=5)
+    await cache.get_or_load("k", AsyncMock(return_value="old"))
+
+    clock.return_value = 116.0
+    loader = AsyncMock(return_value="new")
+
+    assert await cache.get_or_load("k", loader) == "new"
+    assert cache.misses == 2
+
+
+@pytest.mark.asyncio
+async def test_swr_cache_counts_refresh_errors(mocker):
+    clock = mocker.patch("src.infrastructure.cache.time.monotonic")
+    clock.return_value = 100.0
+    cache = SWRCache(max_size=10, ttl=10, stale_ttl=50)
+    await cache.get_or_load("k", AsyncMock(return_value="old"))
+
+    clock.return_value = 115.0
+    failing = AsyncMock(side_effect=RuntimeError("boom"))
+    assert await cache.get_or_load("k", failing) == "old"
+    await asyncio.sleep(0)
+
+    assert cache.refresh_errors == 1
+    assert cache.peek("k") == "old"
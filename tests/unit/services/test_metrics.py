@@ -0,0 +1,167 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.infrastructure import instrumentation, metrics
+from src.infrastructure.metrics import (
+    Histogram,
+    Registry,
+    stats_gauges,
+)
+from src.infrastructure.services.productsService import ProductsService
+
+
+def test_counter_renders_prometheus_text():
+    registry = Registry()
+    counter = registry.counter("hits_total", "Hits.", labels=("route",))
+    counter.inc(route='/a"b')
+    counter.inc(2, route='/a"b')
+
+    assert registry.render() == (
+        "# HELP hits_total Hits.\n"
+        "# TYPE hits_total counter\n"
+        'hits_total{route="/a\\"b"} 3\n'
+    )
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("latency", "Latency.", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        histogram.observe(value)
+
+    samples = {
+        (name, labels.get("le")): value
+        for name, labels, value in histogram.samples()
+    }
+    assert samples[("latency_bucket", "0.1")] == 1
+    assert samples[("latency_bucket", "1")] == 3
+    assert samples[("latency_bucket", "+Inf")] == 4
+    assert samples[("latency_count", None)] == 4
+    assert samples[("latency_sum", None)] == pytest.approx(4.25)
+
+
+def test_stats_gauges_flatten_nested_stats():
+    gauges = stats_gauges("svc", "Stats.", {
+        "breaker": {"state": "open", "rejected": 2},
+        "stale_fallbacks": 1,
+    })
+    rendered = "".join(line for g in gauges for line in g.render())
+
+    assert 'svc_breaker_state{state="open"} 1' in rendered
+    assert "svc_breaker_rejected 2" in rendered
+    assert "svc_stale_fallbacks 1" in rendered
+
+
+@pytest.fixture
+def clean_registry():
+    metrics.registry.clear()
+    yield metrics.registry
+    metrics.registry.clear()
+
+
+def test_middleware_records_route_template(clean_registry):
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        return {"id": item_id}
+
+    app.add_middleware(instrumentation.MetricsMiddleware)
+    app.include_router(instrumentation.metrics_router)
+    client = TestClient(app)
+
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/missing")
+
+    assert metrics.http_requests.value(
+        method="GET", route="/items/{item_id}", status=200
+    ) == 2
+    assert metrics.http_requests.value(
+        method="GET", route="unmatched", status=404
+    ) == 1
+    assert metrics.http_request_duration.count(
+        method="GET", route="/items/{item_id}"
+    ) == 2
+    assert metrics.http_requests_in_flight.value(method="GET") == 0
+
+    response = client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain")
+    assert (
+        'http_requests_total{method="GET",route="/items/{item_id}",'
+        'status="200"} 2' in response.text
+    )
+
+
+@pytest.mark.asyncio
+async def test_queries_are_counted_per_request():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    instrumentation.instrument_engine(engine)
+    try:
+        with instrumentation.track_queries() as queries:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                with instrumentation.track_queries() as inner:
+                    await conn.execute(text("SELECT 1"))
+                    await conn.execute(text("SELECT 2"))
+    finally:
+        await engine.dispose()
+
+    assert inner.count == 2
+    assert queries.count == 3
+    assert queries.duplicates == 1
+    assert queries.repeated() == {"SELECT 1": 2}
+
+
+@pytest.mark.asyncio
+async def test_failed_query_leaves_no_timing_state():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    instrumentation.instrument_engine(engine)
+    try:
+        with instrumentation.track_queries() as queries:
+            async with engine.connect() as conn:
+                with pytest.raises(Exception):
+                    await conn.execute(text("SELECT * FROM missing"))
+                await conn.rollback()
+                await conn.execute(text("SELECT 1"))
+                info = conn.sync_connection.info
+    finally:
+        await engine.dispose()
+
+    assert info == {}
+    assert queries.count == 1
+    assert queries.statements == {"SELECT 1": 1}
+
+
+@pytest.mark.asyncio
+async def test_upstream_calls_are_counted(mocker, clean_registry):
+    response = MagicMock(status_code=200)
+    response.raise_for_status = MagicMock()
+    client = MagicMock()
+    client.get = AsyncMock(
+        side_effect=[httpx.ConnectError("down"), response]
+    )
+    mocker.patch.object(ProductsService, 'get_client', return_value=client)
+
+    await ProductsService.request("https://example.com/products")
+
+    assert metrics.upstream_requests.value(status="connection_error") == 1
+    assert metrics.upstream_requests.value(status=200) == 1
+    assert metrics.upstream_request_duration.count() == 2
+    assert metrics.upstream_errors.value(kind="connection") == 0
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_counts_as_upstream_error(clean_registry):
+    for _ in range(ProductsService.breaker.failure_threshold):
+        ProductsService.breaker.record_failure()
+
+    with pytest.raises(Exception):
+        await ProductsService.request("https://example.com/products")
+
+    assert metrics.upstream_errors.value(kind="circuit_open") == 1
@@ -1,16 +1,23 @@
+import asyncio
+import time
+
 import pytest
 from fastapi import HTTPException
 import httpx
 from unittest.mock import AsyncMock, MagicMock
 
+from src.config.settings import settings
+from src.infrastructure.resilience import LatencyWindow
+
 from src.infrastructure.services.productsService import ProductsService
 
 
 @pytest.mark.asyncio
 async def test_get_products_success(mocker):
-    mock_client = mocker.patch('httpx.AsyncClient')
     mock_client_instance = AsyncMock()
-    mock_client.return_value.__aenter__.return_value = mock_client_instance
+    mocker.patch.object(
+        ProductsService, 'get_client', return_value=mock_client_instance
+    )
 
     mock_response = MagicMock()
     mock_response.status_code = 200
@@ -30,9 +37,10 @@ async def test_get_products_success(mocker):
 
 @pytest.mark.asyncio
 async def test_get_products_http_error(mocker):
-    mock_client = mocker.patch('httpx.AsyncClient')
     mock_client_instance = AsyncMock()
-    mock_client.return_value.__aenter__.return_value = mock_client_instance
+    mocker.patch.object(
+        ProductsService, 'get_client', return_value=mock_client_instance
+    )
 
     http_error = httpx.HTTPStatusError(
         "Server error",
@@ -53,9 +61,10 @@ async def test_get_products_http_error(mocker):
 
 @pytest.mark.asyncio
 async def test_get_products_connection_error(mocker):
-    mock_client = mocker.patch('httpx.AsyncClient')
     mock_client_instance = AsyncMock()
-    mock_client.return_value.__aenter__.return_value = mock_client_instance
+    mocker.patch.object(
+        ProductsService, 'get_client', return_value=mock_client_instance
+    )
 
     mock_client_instance.get.side_effect = httpx.RequestError("Connection error")
 
@@ -68,9 +77,10 @@ async def test_get_products_connection_error(mocker):
 
 @pytest.mark.asyncio
 async def test_get_product_by_id_success(mocker):
-    mock_client = mocker.patch('httpx.AsyncClient')
     mock_client_instance = AsyncMock()
-    mock_client.return_value.__aenter__.return_value = mock_client_instance
+    mocker.patch.object(
+        ProductsService, 'get_client', return_value=mock_client_instance
+    )
 
     mock_response = MagicMock()
     mock_response.status_code = 200
@@ -90,9 +100,10 @@ async def test_get_product_by_id_success(mocker):
 
 @pytest.mark.asyncio
 async def test_get_product_by_id_not_found(mocker):
-    mock_client = mocker.patch('httpx.AsyncClient')
     mock_client_instance = AsyncMock()
-    mock_client.return_value.__aenter__.return_value = mock_client_instance
+    mocker.patch.object(
+        ProductsService, 'get_client', return_value=mock_client_instance
+    )
 
     http_error = httpx.HTTPStatusError(
         "Not found",
@@ -111,9 +122,10 @@ async def test_get_product_by_id_not_found(mocker):
 
 @pytest.mark.asyncio
 async def test_get_product_by_id_http_error(mocker):
-    mock_client = mocker.patch('httpx.AsyncClient')
     mock_client_instance = AsyncMock()
-    mock_client.return_value.__aenter__.return_value = mock_client_instance
+    mocker.patch.object(
+        ProductsService, 'get_client', return_value=mock_client_instance
+    )
 
     http_error = httpx.HTTPStatusError(
         "Server error",
@@ -134,9 +146,10 @@ async def test_get_product_by_id_http_error(mocker):
 
 @pytest.mark.asyncio
 async def test_get_product_by_id_connection_error(mocker):
-    mock_client = mocker.patch('httpx.AsyncClient')
     mock_client_instance = AsyncMock()
-    mock_client.return_value.__aenter__.return_value = mock_client_instance
+    mocker.patch.object(
+        ProductsService, 'get_client', return_value=mock_client_instance
+    )
 
     mock_client_instance.get.side_effect = httpx.RequestError("Connection failed")
 
@@ -145,3 +158,299 @@ async def test_get_product_by_id_connection_error(mocker):
 
     assert exc_info.value.status_code == 500
     assert "Connection error" in exc_info.value.detail
+
+
+@pytest.mark.asyncio
+async def test_shared_client_is_reused(mocker):
+    mocker.patch.object(settings, 'PRODUCTS_HTTP2', False)
+    mocker.patch.object(ProductsService, 'client', None)
+
+    await ProductsService.startup()
+    client = ProductsService.client
+
+    assert client is not None
+    assert ProductsService.get_client() is client
+
+    await ProductsService.shutdown()
+    assert ProductsService.client is None
+    assert client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_get_products_is_cached_and_primes_product_lookups(mocker):
+    mock_client_instance = AsyncMock()
+    mocker.patch.object(
+        ProductsService, 'get_client', return_value=mock_client_instance
+    )
+
+    mock_response = MagicMock()
+    mock_response.json.return_value = [{"id": 1, "title": "Test Product"}]
+    mock_client_instance.get.return_value = mock_response
+
+    await ProductsService.get_products()
+    await ProductsService.get_products()
+    product = await ProductsService.get_product_by_id(1)
+
+    assert product == {"id": 1, "title": "Test Product"}
+    mock_client_instance.get.assert_called_once_with(
+        "https://fakestoreapi.com/products"
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_products_by_ids_uses_catalog_then_fetches_rest(mocker):
+    mocker.patch.object(
+        ProductsService,
+        'get_products',
+        AsyncMock(return_value=[{"id": 1}, {"id": 2}, {"id": 3}]),
+    )
+    get_by_id = mocker.patch.object(
+        ProductsService,
+        'get_product_by_id',
+        AsyncMock(side_effect=lambda product_id: (
+            {"id": int(product_id)} if product_id == "40" else None
+        )),
+    )
+
+    result = await ProductsService.get_products_by_ids(
+        ["1", 3, "3", "40", "50"]
+    )
+
+    assert result == {"1": {"id": 1}, "3": {"id": 3}, "40": {"id": 40}}
+    assert sorted(c.args[0] for c in get_by_id.await_args_list) == ["40", "50"]
+
+
+@pytest.mark.asyncio
+async def test_get_products_by_ids_bounds_concurrency(mocker):
+    mocker.patch.object(settings, 'PRODUCTS_FETCH_CONCURRENCY', 2)
+    mocker.patch.object(
+        ProductsService,
+        'get_products',
+        AsyncMock(side_effect=HTTPException(500, "down")),
+    )
+    in_flight = 0
+    peak = 0
+
+    async def get_product_by_id(product_id):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return {"id": int(product_id)}
+
+    mocker.patch.object(ProductsService, 'get_product_by_id', get_product_by_id)
+
+    result = await ProductsService.get_products_by_ids(range(10))
+
+    assert len(result) == 10
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_product_lookups_hit_upstream_once(mocker):
+    release = asyncio.Event()
+
+    async def fetch_product(product_id):
+        await release.wait()
+        return {"id": int(product_id)}
+
+    fetch = mocker.patch.object(
+        ProductsService, 'fetch_product', AsyncMock(side_effect=fetch_product)
+    )
+
+    waiters = [
+        asyncio.create_task(ProductsService.get_product_by_id("7"))
+        for _ in range(10)
+    ]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters)
+
+    assert all(result == {"id": 7} for result in results)
+    fetch.assert_awaited_once_with("7")
+
+
+def server_error(url):
+    return httpx.HTTPStatusError(
+        "Server error",
+        request=httpx.Request("GET", url),
+        response=httpx.Response(503),
+    )
+
+
+@pytest.mark.asyncio
+async def test_request_retries_transient_errors(mocker):
+    mocker.patch.object(settings, 'PRODUCTS_MAX_RETRIES', 2)
+    mock_client_instance = AsyncMock()
+    mocker.patch.object(
+        ProductsService, 'get_client', return_value=mock_client_instance
+    )
+    ok = MagicMock()
+    ok.json.return_value = {"id": 1}
+    mock_client_instance.get.side_effect = [
+        httpx.ConnectError("reset"),
+        ok,
+    ]
+
+    result = await ProductsService.get_product_by_id("1")
+
+    assert result == {"id": 1}
+    assert mock_client_instance.get.call_count == 2
+    assert ProductsService.breaker.consecutive_failures == 0
+
+
+@pytest.mark.asyncio
+async def test_request_does_not_retry_client_errors(mocker):
+    mock_client_instance = AsyncMock()
+    mocker.patch.object(
+        ProductsService, 'get_client', return_value=mock_client_instance
+    )
+    not_found = MagicMock()
+    not_found.raise_for_status.side_effect = httpx.HTTPStatusError(
+        "Not found",
+        request=httpx.Request("GET", "https://fakestoreapi.com/products/9"),
+        response=httpx.Response(404),
+    )
+    mock_client_instance.get.return_value = not_found
+
+    assert await ProductsService.get_product_by_id("9") is None
+    mock_client_instance.get.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_open_breaker_fails_fast_without_calling_upstream(mocker):
+    mocker.patch.object(settings, 'PRODUCTS_MAX_RETRIES', 0)
+    mock_client_instance = AsyncMock()
+    mocker.patch.object(
+        ProductsService, 'get_client', return_value=mock_client_instance
+    )
+    failing = MagicMock()
+    failing.raise_for_status.side_effect = server_error(
+        "https://fakestoreapi.com/products/1"
+    )
+    mock_client_instance.get.return_value = failing
+
+    for _ in range(ProductsService.breaker.failure_threshold):
+        with pytest.raises(HTTPException):
+            await ProductsService.get_product_by_id("1")
+    calls = mock_client_instance.get.call_count
+
+    with pytest.raises(HTTPException) as exc_info:
+        await ProductsService.get_product_by_id("1")
+
+    assert exc_info.value.status_code == 503
+    assert mock_client_instance.get.call_count == calls
+    assert ProductsService.stats()["breaker"]["state"] == "open"
+
+
+def half_open_breaker():
+    breaker = ProductsService.breaker
+    breaker._state = breaker.OPEN
+    breaker._opened_at = time.monotonic() - breaker.reset_timeout
+    return breaker
+
+
+@pytest.mark.asyncio
+async def test_cancelled_probe_lets_the_next_request_probe(mocker):
+    started = asyncio.Event()
+
+    async def hang(client, url):
+        started.set()
+        await asyncio.Event().wait()
+
+    mocker.patch.object(ProductsService, 'send', hang)
+    breaker = half_open_breaker()
+
+    probe = asyncio.create_task(ProductsService.request("http://x/products"))
+    await started.wait()
+    assert not breaker.allow_request()
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+
+    assert breaker.state == breaker.HALF_OPEN
+    assert breaker.allow_request()
+
+
+@pytest.mark.asyncio
+async def test_probe_failing_unexpectedly_releases_the_breaker(mocker):
+    mocker.patch.object(
+        ProductsService, 'send', AsyncMock(side_effect=RuntimeError("boom"))
+    )
+    breaker = half_open_breaker()
+
+    with pytest.raises(RuntimeError):
+        await ProductsService.request("http://x/products")
+
+    assert breaker.allow_request()
+
+
+@pytest.mark.asyncio
+async def test_failed_reload_serves_last_known_good_product(mocker):
+    clock = mocker.patch("src.infrastructure.cache.time.monotonic")
+    clock.return_value = 100.0
+    ProductsService.cache.set(ProductsService.product_key("1"), {"id": 1})
+    clock.return_value = 100.0 + 10 ** 6
+
+    mocker.patch.object(
+        ProductsService,
+        'fetch_product',
+        AsyncMock(side_effect=HTTPException(503, "down")),
+    )
+    fallbacks = ProductsService.stale_fallbacks
+
+    assert await ProductsService.get_product_by_id("1") == {"id": 1}
+    assert ProductsService.stale_fallbacks == fallbacks + 1
+
+
+@pytest.mark.asyncio
+async def test_hedge_delay_uses_observed_p95(mocker):
+    mocker.patch.object(settings, 'PRODUCTS_HEDGE_DELAY_SECONDS', 0)
+    mocker.patch.object(settings, 'PRODUCTS_HEDGE_MIN_SAMPLES', 10)
+    mocker.patch.object(ProductsService, 'latencies', LatencyWindow())
+
+    assert ProductsService.hedge_delay() is None
+
+    for ms in range(1, 21):
+        ProductsService.latencies.observe(ms / 1000)
+
+    assert ProductsService.hedge_delay() == pytest.approx(0.020)
+
+    mocker.patch.object(settings, 'PRODUCTS_HEDGE_DELAY_SECONDS', 0.25)
+    assert ProductsService.hedge_delay() == 0.25
+
+
+@pytest.mark.asyncio
+async def test_send_hedges_when_enabled(mocker):
+    mocker.patch.object(settings, 'PRODUCTS_HEDGE_ENABLED', True)
+    mocker.patch.object(settings, 'PRODUCTS_HEDGE_DELAY_SECONDS', 0.01)
+    run = mocker.patch.object(
+        ProductsService.hedger, 'run', AsyncMock(return_value="response")
+    )
+
+    assert await ProductsService.send(AsyncMock(), "url") == "response"
+    assert run.await_args.args[1] == 0.01
+
+
+@pytest.mark.asyncio
+async def test_products_api_url_is_configurable(mocker):
+    mock_client_instance = AsyncMock()
+    mocker.patch.object(
+        ProductsService, 'get_client', return_value=mock_client_instance
+    )
+    mocker.patch.object(
+        settings, 'PRODUCTS_API_URL', "http://products.local"
+    )
+    mock_response = MagicMock()
+    mock_response.json.return_value = [{"id": 1, "title": "Test Product"}]
+    mock_response.raise_for_status = MagicMock()
+    mock_client_instance.get.return_value = mock_response
+
+    await ProductsService.get_products()
+    await ProductsService.get_product_by_id("2")
+
+    assert [c.args[0] for c in mock_client_instance.get.call_args_list] == [
+        "http://products.local/products",
+        "http://products.local/products/2",
+    ]
@@ -0,0 +1,151 @@
+import asyncio
+
+import pytest
+
+from src.infrastructure.resilience import (
+    CircuitBreaker,
+    Hedger,
+    LatencyWindow,
+    TokenBudget,
+    backoff_delay,
+)
+
+
+def test_breaker_opens_after_threshold_and_fails_fast():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+
+    breaker.record_failure()
+    assert breaker.allow_request()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+    assert breaker.stats()["rejected"] == 1
+    assert breaker.stats()["times_opened"] == 1
+
+
+def test_breaker_half_open_allows_single_probe(mocker):
+    clock = mocker.patch("src.infrastructure.resilience.time.monotonic")
+    clock.return_value = 100.0
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    breaker.record_failure()
+
+    clock.return_value = 111.0
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow_request()
+
+
+def test_breaker_reopens_when_probe_fails(mocker):
+    clock = mocker.patch("src.infrastructure.resilience.time.monotonic")
+    clock.return_value = 100.0
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10)
+    for _ in range(3):
+        breaker.record_failure()
+
+    clock.return_value = 111.0
+    assert breaker.allow_request()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.stats()["times_opened"] == 2
+
+
+def test_retry_budget_limits_retries_to_a_ratio_of_requests():
+    budget = TokenBudget(ratio=0.5, max_tokens=1)
+
+    assert budget.withdraw()
+    assert not budget.withdraw()
+
+    budget.deposit()
+    assert not budget.withdraw()
+    budget.deposit()
+    assert budget.withdraw()
+    assert budget.exhausted == 2
+
+
+@pytest.mark.parametrize("attempt", range(6))
+def test_backoff_delay_is_capped(attempt):
+    delay = backoff_delay(attempt, base=0.1, cap=0.5)
+    assert 0 <= delay <= min(0.5, 0.1 * 2 ** attempt)
+
+
+def test_latency_window_percentile():
+    window = LatencyWindow(size=100)
+    for ms in range(1, 101):
+        window.observe(ms / 1000)
+
+    assert window.percentile(0.95) == pytest.approx(0.096)
+    assert len(window) == 100
+
+
+@pytest.mark.asyncio
+async def test_hedger_returns_fast_primary_without_hedging():
+    hedger = Hedger(TokenBudget(ratio=1, max_tokens=5))
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        return "primary"
+
+    assert await hedger.run(fetch, delay=0.05) == "primary"
+    assert calls == 1
+    assert hedger.hedges == 0
+
+
+@pytest.mark.asyncio
+async def test_hedger_takes_first_answer_and_cancels_the_other():
+    hedger = Hedger(TokenBudget(ratio=1, max_tokens=5))
+    delays = iter([1.0, 0.0])
+    cancelled = []
+
+    async def fetch():
+        delay = next(delays)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            cancelled.append(delay)
+            raise
+        return delay
+
+    assert await hedger.run(fetch, delay=0.01) == 0.0
+    await asyncio.sleep(0)
+
+    assert cancelled == [1.0]
+    assert hedger.stats() == {"hedges": 1, "hedge_wins": 1}
+
+
+@pytest.mark.asyncio
+async def test_hedger_falls_back_to_other_attempt_on_error():
+    hedger = Hedger(TokenBudget(ratio=1, max_tokens=5))
+    attempts = iter(["slow-ok", "fail"])
+
+    async def fetch():
+        attempt = next(attempts)
+        if attempt == "fail":
+            raise RuntimeError("boom")
+        await asyncio.sleep(0.03)
+        return attempt
+
+    assert await hedger.run(fetch, delay=0.01) == "slow-ok"
+
+
+@pytest.mark.asyncio
+async def test_hedger_respects_budget():
+    hedger = Hedger(TokenBudget(ratio=0, max_tokens=0))
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        return "primary"
+
+    assert await hedger.run(fetch, delay=0.001) == "primary"
+    assert calls == 1
+    assert hedger.hedges == 0
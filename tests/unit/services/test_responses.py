@@ -0,0 +1,45 @@
+from uuid import uuid4
+
+import orjson
+
+from src.domains.consumers.schemas import ConsumerResponse
+from src.domains.products.schemas import ProductDetails
+from src.infrastructure.responses import ModelResponse
+
+
+def test_model_response_serializes_models_without_revalidation(mocker):
+    consumer = ConsumerResponse(
+        id=uuid4(),
+        name="Test",
+        email="test@example.com",
+        favorites=[ProductDetails(id=1, title="P", price=1.5, image="i")],
+    )
+    validate = mocker.spy(ConsumerResponse, 'model_validate')
+
+    response = ModelResponse(consumer)
+
+    validate.assert_not_called()
+    assert response.media_type == "application/json"
+    assert orjson.loads(response.body) == {
+        "id": str(consumer.id),
+        "name": "Test",
+        "email": "test@example.com",
+        "favorites": [{
+            "id": 1,
+            "title": "P",
+            "price": 1.5,
+            "image": "i",
+            "rating": None,
+        }],
+    }
+
+
+def test_model_response_serializes_dicts_with_nested_models():
+    response = ModelResponse({
+        "data": [ProductDetails(id=2, title="P", price=2.0, image="i")],
+        "total": 1,
+    })
+
+    body = orjson.loads(response.body)
+    assert body["total"] == 1
+    assert body["data"][0]["id"] == 2
@@ -0,0 +1,124 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+from src.config.settings import settings
+from src.infrastructure import security
+from src.infrastructure.cache import LRUCache
+from src.infrastructure.security import (
+    PasswordHasher,
+    create_access_token,
+    get_current_user,
+    get_password_hash_async,
+    verify_password_async,
+)
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_run_off_the_event_loop():
+    hashed = await get_password_hash_async("senhaSegura123")
+
+    assert await verify_password_async("senhaSegura123", hashed)
+    assert not await verify_password_async("outraSenha", hashed)
+
+
+@pytest.mark.asyncio
+async def test_password_hasher_bounds_concurrency_and_tracks_queue():
+    hasher = PasswordHasher(workers=2, max_queue=0)
+    release = threading.Event()
+    loop_thread = threading.get_ident()
+    threads = []
+
+    def slow_hash(value):
+        threads.append(threading.get_ident())
+        release.wait(timeout=5)
+        return value
+
+    tasks = [
+        asyncio.create_task(hasher.run(slow_hash, i)) for i in range(5)
+    ]
+    await asyncio.sleep(0.05)
+
+    assert hasher.running == 2
+    assert hasher.queued == 3
+
+    release.set()
+    assert await asyncio.gather(*tasks) == [0, 1, 2, 3, 4]
+    assert loop_thread not in threads
+    assert hasher.stats()["peak_queued"] == 3
+    assert hasher.stats()["completed"] == 5
+    hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_password_hasher_rejects_when_queue_is_full():
+    hasher = PasswordHasher(workers=1, max_queue=1)
+
+    def slow(value):
+        time.sleep(0.05)
+        return value
+
+    tasks = [asyncio.create_task(hasher.run(slow, i)) for i in range(2)]
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await hasher.run(slow, 3)
+
+    assert exc_info.value.status_code == 503
+    assert await asyncio.gather(*tasks) == [0, 1]
+    assert hasher.rejected == 1
+    hasher.shutdown()
+
+
+@pytest.fixture
+def empty_token_cache(mocker):
+    mocker.patch.object(security, 'token_cache', LRUCache(max_size=10))
+
+
+def bearer(token):
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_caches_verified_tokens(
+    mocker, empty_token_cache
+):
+    token = create_access_token("user-1")
+    decode = mocker.spy(security.jwt, 'decode')
+
+    first = await get_current_user(bearer(token))
+    second = await get_current_user(bearer(token))
+
+    assert first.user_id == second.user_id == "user-1"
+    decode.assert_called_once()
+    assert security.token_cache.stats()["hits"] == 1
+    assert security.token_cache.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cached_token_expires_with_the_token(mocker, empty_token_cache):
+    token = create_access_token("user-1")
+    await get_current_user(bearer(token))
+    decode = mocker.spy(security.jwt, 'decode')
+
+    expired_at = time.monotonic() + (
+        settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60 + 1
+    )
+    mocker.patch(
+        "src.infrastructure.cache.time.monotonic", return_value=expired_at
+    )
+    await get_current_user(bearer(token))
+
+    decode.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_invalid_token_is_not_cached(empty_token_cache):
+    with pytest.raises(HTTPException):
+        await get_current_user(bearer("not-a-token"))
+
+    assert len(security.token_cache) == 0